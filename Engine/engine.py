@@ -1,88 +1,318 @@
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 
+import numpy as np
+
+from Engine.jit import HAVE_NUMBA, njit, prange
+
+
+FRAME_WIDTH = 64
+FRAME_HEIGHT = 32
+
+
+@lru_cache(maxsize=64)
+def _bezier_basis(steps: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Quadratic Bezier weights for t = i / steps; shared between calls, so the
+    # arrays are made read-only.
+    t = np.arange(steps + 1) / steps
+    mt = 1.0 - t
+    basis = (mt * mt, 2 * mt * t, t * t)
+    for arr in basis:
+        arr.flags.writeable = False
+    return basis
+
+
+def _pack565(r, g, b):
+    # Works on ints and on integer numpy arrays alike.
+    return ((r & 0x1F) << 11) | ((g & 0x3F) << 5) | (b & 0x1F)
+
+
+def _unpack565(px: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return (px >> 11) & 0x1F, (px >> 5) & 0x3F, px & 0x1F
+
+
+@njit(cache=True, boundscheck=False)
+def _bresenham(px, x1, y1, x2, y2, v):
+    h, w = px.shape
+    dx = abs(x2 - x1)
+    dy = -abs(y2 - y1)
+    sx = 1 if x1 < x2 else -1
+    sy = 1 if y1 < y2 else -1
+    err = dx + dy
+
+    while True:
+        if 0 <= x1 < w and 0 <= y1 < h:
+            px[y1, x1] = v
+        if x1 == x2 and y1 == y2:
+            break
+        e2 = 2 * err
+        if e2 >= dy:
+            err += dy
+            x1 += sx
+        if e2 <= dx:
+            err += dx
+            y1 += sy
+
+
+@njit(cache=True, boundscheck=False)
+def _polyline(px, xs, ys, v):
+    # Join consecutive points with Bresenham segments, skipping repeated
+    # points (their pixel was already drawn as the previous segment's end).
+    for i in range(1, xs.shape[0]):
+        if i > 1 and xs[i] == xs[i - 1] and ys[i] == ys[i - 1]:
+            continue
+        _bresenham(px, xs[i - 1], ys[i - 1], xs[i], ys[i], v)
+
+
+@njit(cache=True, boundscheck=False)
+def _oval(px, x1, y1, x2, y2, v):
+    # Filled ellipse in the box (x1, y1)-(x2, y2), corners already sorted.
+    # Each row's half-width is rounded to a pixel span and clipped to the
+    # frame once, so the span itself is a single slice store.
+    h, w = px.shape
+    cx = (x1 + x2) / 2.0
+    cy = (y1 + y2) / 2.0
+    rx = max(1.0, (x2 - x1) / 2.0)
+    ry = max(1.0, (y2 - y1) / 2.0)
+    for y in range(max(y1, 0), min(y2, h - 1) + 1):
+        ny = (y - cy) / ry
+        t = 1.0 - (ny * ny)
+        if t < 0:
+            continue
+        span = rx * np.sqrt(t)
+        xa = max(int(np.rint(cx - span)), 0)
+        xb = min(int(np.rint(cx + span)), w - 1)
+        if xa <= xb:
+            px[y, xa:xb + 1] = v
+
+
+@njit(cache=True, boundscheck=False)
+def _flood(px, sx, sy, v):
+    # Scanline flood fill: each popped seed is widened to the full run of
+    # target-coloured pixels on its row, then the rows above and below are
+    # scanned for new seeds. Every pixel is pushed at most once. Seeds are
+    # packed as a single y * w + x index into a flat stack and visited map.
+    h, w = px.shape
+    target = px[sy, sx]
+    visited = np.zeros(h * w, np.uint8)
+    stack = np.empty(h * w, np.int32)
+    stack[0] = sy * w + sx
+    sp = 1
+    visited[sy * w + sx] = 1
+    while sp > 0:
+        sp -= 1
+        i = stack[sp]
+        y = i // w
+        x = i - y * w
+        if px[y, x] != target:
+            continue
+        lx = x
+        while lx > 0 and px[y, lx - 1] == target:
+            lx -= 1
+        rx = x
+        while rx < w - 1 and px[y, rx + 1] == target:
+            rx += 1
+        for xi in range(lx, rx + 1):
+            px[y, xi] = v
+            visited[y * w + xi] = 1
+        for ny in (y - 1, y + 1):
+            if ny < 0 or ny >= h:
+                continue
+            row = ny * w
+            for xi in range(lx, rx + 1):
+                if visited[row + xi]:
+                    continue
+                if px[ny, xi] == target:
+                    visited[row + xi] = 1
+                    stack[sp] = row + xi
+                    sp += 1
+
+
+_OP_PIXEL, _OP_RECT, _OP_LINE, _OP_OVAL, _OP_FILL = range(5)
+
+
+@njit(cache=True, parallel=True)
+def _render_frames(buf, ops):
+    # Replay encoded ops onto a stack of frames, one thread per frame. Each
+    # row of ops is (frame index, opcode, x1, y1, x2, y2, packed colour) with
+    # coordinates already normalised; a frame applies its rows in order.
+    for f in prange(buf.shape[0]):
+        px = buf[f]
+        for k in range(ops.shape[0]):
+            if ops[k, 0] != f:
+                continue
+            op = ops[k, 1]
+            x1 = ops[k, 2]
+            y1 = ops[k, 3]
+            x2 = ops[k, 4]
+            y2 = ops[k, 5]
+            v = ops[k, 6]
+            if op == _OP_PIXEL:
+                px[y1, x1] = v
+            elif op == _OP_RECT:
+                px[y1:y2 + 1, x1:x2 + 1] = v
+            elif op == _OP_LINE:
+                _bresenham(px, x1, y1, x2, y2, v)
+            elif op == _OP_OVAL:
+                _oval(px, x1, y1, x2, y2, v)
+            elif px[y1, x1] != v:
+                _flood(px, x1, y1, v)
+
+
+def _encode_op(index, name, args):
+    # Normalise one (name, *args) op into a _render_frames row the way the
+    # matching Frame method would. Returns None for ops that draw nothing and
+    # raises LookupError for ops the kernel cannot replay.
+    if name == "setColor":
+        x, y, r, g, b = map(int, args)
+        if not (0 <= x < FRAME_WIDTH and 0 <= y < FRAME_HEIGHT):
+            raise LookupError(name)
+        return (index, _OP_PIXEL, x, y, x, y, _pack565(r, g, b))
+    if name == "fill":
+        x, y, r, g, b = map(int, args)
+        if not (0 <= x < FRAME_WIDTH and 0 <= y < FRAME_HEIGHT):
+            return None
+        return (index, _OP_FILL, x, y, x, y, _pack565(r, g, b))
+    if name not in ("makeRect", "makeLine", "makeOval"):
+        raise LookupError(name)
+    x1, y1, x2, y2, r, g, b = map(int, args)
+    v = _pack565(r, g, b)
+    if name == "makeLine":
+        return (index, _OP_LINE, x1, y1, x2, y2, v)
+    x1, x2 = sorted((x1, x2))
+    y1, y2 = sorted((y1, y2))
+    if name == "makeOval":
+        if y2 < 0 or y1 > FRAME_HEIGHT - 1:
+            return None
+        return (index, _OP_OVAL, x1, y1, x2, y2, v)
+    x1 = max(0, x1)
+    y1 = max(0, y1)
+    x2 = min(FRAME_WIDTH - 1, x2)
+    y2 = min(FRAME_HEIGHT - 1, y2)
+    if x1 > x2 or y1 > y2:
+        return None
+    return (index, _OP_RECT, x1, y1, x2, y2, v)
+
 
 class Frame:
     # Frame represents a 64x32 pixel display where each pixel is an RGB565 tuple.
+    # Pixels are stored packed, one little-endian uint16 RGB565 word each, which
+    # is also the wire format: channels are unpacked on read and sending a frame
+    # is a straight copy of the buffer.
     def __init__(self, start=None, on_change=None):
-        if start is None:
-            self.display = [[(0, 0, 0) for x in range(64)] for y in range(32)]
-        else:
-            # TODO: validate start
+        self._px = np.zeros((FRAME_HEIGHT, FRAME_WIDTH), "<u2")
+        if start is not None:
             self.display = start
         self._on_change = on_change
+        self._notify_depth = 0
+        self._notify_dirty = False
+
+    @property
+    def display(self) -> list[list[tuple[int, int, int]]]:
+        # Compatibility view: builds a fresh list-of-rows of (r, g, b) tuples.
+        # Mutating the returned lists does not write back to the frame.
+        r, g, b = _unpack565(self._px)
+        return [
+            list(zip(r_row, g_row, b_row))
+            for r_row, g_row, b_row in zip(r.tolist(), g.tolist(), b.tolist())
+        ]
+
+    @display.setter
+    def display(self, pixels) -> None:
+        arr = np.asarray(pixels, dtype=np.int64)
+        if arr.shape != (FRAME_HEIGHT, FRAME_WIDTH, 3):
+            raise ValueError("Frame must be 32 rows of 64 (r, g, b) pixels")
+        self._px[:, :] = _pack565(arr[:, :, 0], arr[:, :, 1], arr[:, :, 2])
+
+    def copy_from(self, other: "Frame") -> None:
+        # Take other's pixels with one buffer copy. Like assigning display,
+        # this does not fire the change notification.
+        np.copyto(self._px, other._px)
 
     def set_on_change(self, on_change) -> None:
         self._on_change = on_change
 
     def _notify_change(self) -> None:
+        if self._notify_depth:
+            self._notify_dirty = True
+            return
         if self._on_change is not None:
             self._on_change(self)
 
+    @contextmanager
+    def batch(self):
+        # Coalesce change notifications: edits inside the block fire at most
+        # one notification when the outermost batch exits.
+        self._notify_depth += 1
+        try:
+            yield self
+        finally:
+            self._notify_depth -= 1
+            if self._notify_depth == 0 and self._notify_dirty:
+                self._notify_dirty = False
+                self._notify_change()
+
     def setRed(self, x, y, value):
-        r, g, b = self.display[y][x]
-        self.display[y][x] = (value, g, b)
+        self._px[y, x] = (int(self._px[y, x]) & 0x07FF) | ((value & 0x1F) << 11)
         self._notify_change()
 
     def setGreen(self, x, y, value):
-        r, g, b = self.display[y][x]
-        self.display[y][x] = (r, value, b)
+        self._px[y, x] = (int(self._px[y, x]) & 0xF81F) | ((value & 0x3F) << 5)
         self._notify_change()
 
     def setBlue(self, x, y, value):
-        r, g, b = self.display[y][x]
-        self.display[y][x] = (r, g, value)
+        self._px[y, x] = (int(self._px[y, x]) & 0xFFE0) | (value & 0x1F)
         self._notify_change()
 
     def setColor(self, x, y, r, g, b):
-        self.display[y][x] = (r, g, b)
+        self._px[y, x] = _pack565(r, g, b)
         self._notify_change()
 
     def getPixel(self, x, y):
-        return self.display[y][x]
+        v = int(self._px[y, x])
+        return (v >> 11) & 0x1F, (v >> 5) & 0x3F, v & 0x1F
 
     def getRed(self, x, y):
-        r, g, b = self.display[y][x]
-        return r
+        return (int(self._px[y, x]) >> 11) & 0x1F
 
     def getGreen(self, x, y):
-        r, g, b = self.display[y][x]
-        return g
+        return (int(self._px[y, x]) >> 5) & 0x3F
 
     def getBlue(self, x, y):
-        r, g, b = self.display[y][x]
-        return b
+        return int(self._px[y, x]) & 0x1F
+
+    def apply_batch(self, ops):
+        # Apply (method name, *args) drawing ops in order, notifying once.
+        # Runs serially; use render_frames to spread many frames over cores.
+        with self.batch():
+            for name, *args in ops:
+                if name not in _DRAW_OPS:
+                    raise ValueError(f"Unknown frame op: {name}")
+                getattr(self, name)(*args)
 
     def makeRect(self, x1, y1, x2, y2, r, g, b):
-        # NEW
-        for y in range(y1, y2 + 1):
-            for x in range(x1, x2 + 1):
-                self.setColor(x, y, r, g, b)
+        # NEW: filled rectangle, clipped to the frame
+        x1, x2 = sorted((int(x1), int(x2)))
+        y1, y2 = sorted((int(y1), int(y2)))
+        if x1 <= 0 and y1 <= 0 and x2 >= FRAME_WIDTH - 1 and y2 >= FRAME_HEIGHT - 1:
+            # Whole-frame fill (clears, backgrounds): straight memset.
+            self._px.fill(_pack565(r, g, b))
+            self._notify_change()
+            return
+        x1 = max(0, x1)
+        y1 = max(0, y1)
+        x2 = min(FRAME_WIDTH - 1, x2)
+        y2 = min(FRAME_HEIGHT - 1, y2)
+        if x1 > x2 or y1 > y2:
+            return
+        self._px[y1:y2 + 1, x1:x2 + 1] = _pack565(r, g, b)
+        self._notify_change()
 
     def makeLine(self, x1, y1, x2, y2, r, g, b):
         # NEW: Bresenham line
-        x1 = int(x1)
-        y1 = int(y1)
-        x2 = int(x2)
-        y2 = int(y2)
-
-        dx = abs(x2 - x1)
-        dy = -abs(y2 - y1)
-        sx = 1 if x1 < x2 else -1
-        sy = 1 if y1 < y2 else -1
-        err = dx + dy
-
-        while True:
-            if 0 <= x1 < 64 and 0 <= y1 < 32:
-                self.setColor(x1, y1, r, g, b)
-            if x1 == x2 and y1 == y2:
-                break
-            e2 = 2 * err
-            if e2 >= dy:
-                err += dy
-                x1 += sx
-            if e2 <= dx:
-                err += dx
-                y1 += sy
+        _bresenham(self._px, int(x1), int(y1), int(x2), int(y2), _pack565(r, g, b))
+        self._notify_change()
 
     def makeCurve(self, x1, y1, x2, y2, cx, cy, r, g, b):
         # NEW: Quadratic Bezier curve from (x1,y1) to (x2,y2) with control (cx,cy)
@@ -94,18 +324,11 @@ class Frame:
         cy = float(cy)
 
         steps = int(max(abs(x2 - x1), abs(y2 - y1)) * 3) + 8
-        prev_x = None
-        prev_y = None
-        for i in range(steps + 1):
-            t = i / steps
-            mt = 1.0 - t
-            x = (mt * mt * x1) + (2 * mt * t * cx) + (t * t * x2)
-            y = (mt * mt * y1) + (2 * mt * t * cy) + (t * t * y2)
-            xi = int(round(x))
-            yi = int(round(y))
-            if prev_x is not None and prev_y is not None:
-                self.makeLine(prev_x, prev_y, xi, yi, r, g, b)
-            prev_x, prev_y = xi, yi
+        w1, wc, w2 = _bezier_basis(steps)
+        xs = np.rint((w1 * x1) + (wc * cx) + (w2 * x2)).astype(np.int64)
+        ys = np.rint((w1 * y1) + (wc * cy) + (w2 * y2)).astype(np.int64)
+        _polyline(self._px, xs, ys, _pack565(r, g, b))
+        self._notify_change()
 
     def makeOval(self, x1, y1, x2, y2, r, g, b):
         # NEW: filled ellipse bounded by rectangle (x1,y1)-(x2,y2)
@@ -117,23 +340,10 @@ class Frame:
             x1, x2 = x2, x1
         if y1 > y2:
             y1, y2 = y2, y1
-
-        cx = (x1 + x2) / 2.0
-        cy = (y1 + y2) / 2.0
-        rx = max(1.0, (x2 - x1) / 2.0)
-        ry = max(1.0, (y2 - y1) / 2.0)
-        for y in range(y1, y2 + 1):
-            if 0 <= y < 32:
-                ny = (y - cy) / ry
-                t = 1.0 - (ny * ny)
-                if t < 0:
-                    continue
-                span = rx * (t ** 0.5)
-                xa = int(round(cx - span))
-                xb = int(round(cx + span))
-                for x in range(xa, xb + 1):
-                    if 0 <= x < 64:
-                        self.setColor(x, y, r, g, b)
+        if y2 < 0 or y1 > FRAME_HEIGHT - 1:
+            return
+        _oval(self._px, x1, y1, x2, y2, _pack565(r, g, b))
+        self._notify_change()
 
     def fill(self, startx, starty, r, g, b):
         # NEW: 4-direction flood fill
@@ -141,69 +351,143 @@ class Frame:
         starty = int(starty)
         if not (0 <= startx < 64 and 0 <= starty < 32):
             return
-        target = self.display[starty][startx]
-        replacement = (r, g, b)
-        if target == replacement:
+        v = _pack565(r, g, b)
+        if self._px[starty, startx] == v:
             return
-        stack = [(startx, starty)]
-        visited = set()
-        while stack:
-            x, y = stack.pop()
-            if (x, y) in visited:
-                continue
-            visited.add((x, y))
-            if self.display[y][x] != target:
-                continue
-            self.display[y][x] = replacement
-            if x > 0:
-                stack.append((x - 1, y))
-            if x < 63:
-                stack.append((x + 1, y))
-            if y > 0:
-                stack.append((x, y - 1))
-            if y < 31:
-                stack.append((x, y + 1))
+        _flood(self._px, startx, starty, v)
+        self._notify_change()
+
+    def floodRegion(self, startx, starty):
+        # (x, y) of every pixel fill() would recolour from the start point.
+        # Runs the fill kernel on a scratch copy with a colour that differs
+        # from the target, so pixel matching is one packed compare.
+        startx = int(startx)
+        starty = int(starty)
+        if not (0 <= startx < 64 and 0 <= starty < 32):
+            return []
+        scratch = self._px.copy()
+        _flood(scratch, startx, starty, int(scratch[starty, startx]) ^ 1)
+        ys, xs = np.nonzero(scratch != self._px)
+        return list(zip(xs.tolist(), ys.tolist()))
 
     def moveSelection(self, pixels, dx, dy):
         # NEW: move a list of ((x,y), (r,g,b)) by (dx,dy)
         dx = int(dx)
         dy = int(dy)
+        if not pixels:
+            return
+        pts = np.asarray([p for p, _color in pixels], np.int64).reshape(-1, 2)
+        cols = np.asarray([c for _p, c in pixels], np.int64).reshape(-1, 3)
+        vals = _pack565(cols[:, 0], cols[:, 1], cols[:, 2])
+        xs = pts[:, 0]
+        ys = pts[:, 1]
         # clear originals
-        for (x, y), _color in pixels:
-            if 0 <= x < 64 and 0 <= y < 32:
-                self.setColor(x, y, 0, 0, 0)
+        src = (xs >= 0) & (xs < 64) & (ys >= 0) & (ys < 32)
+        self._px[ys[src], xs[src]] = 0
         # draw moved
-        for (x, y), color in pixels:
-            nx = x + dx
-            ny = y + dy
-            if 0 <= nx < 64 and 0 <= ny < 32:
-                r, g, b = color
-                self.setColor(nx, ny, r, g, b)
+        nx = xs + dx
+        ny = ys + dy
+        dst = (nx >= 0) & (nx < 64) & (ny >= 0) & (ny < 32)
+        self._px[ny[dst], nx[dst]] = vals[dst]
+        self._notify_change()
 
 
+_DRAW_OPS = frozenset(
+    (
+        "setRed",
+        "setGreen",
+        "setBlue",
+        "setColor",
+        "makeRect",
+        "makeLine",
+        "makeCurve",
+        "makeOval",
+        "fill",
+        "moveSelection",
+    )
+)
+
+
+def render_frames(frames: list[Frame], ops_per_frame) -> None:
+    # Apply ops_per_frame[i] to frames[i] (see Frame.apply_batch). With Numba
+    # and more than one frame, the ops are encoded once and replayed by a
+    # parallel kernel over the stacked frames; otherwise each frame is drawn
+    # serially. Ops the kernel does not cover also take the serial path.
+    ops_per_frame = [list(ops) for ops in ops_per_frame]
+    if len(ops_per_frame) != len(frames):
+        raise ValueError("Need one op list per frame")
+    rows = []
+    if HAVE_NUMBA and len(frames) > 1:
+        try:
+            for index, ops in enumerate(ops_per_frame):
+                for name, *args in ops:
+                    row = _encode_op(index, name, args)
+                    if row is not None:
+                        rows.append(row)
+        except LookupError:
+            rows = None
+    else:
+        rows = None
+    if rows is None:
+        for frame, ops in zip(frames, ops_per_frame):
+            frame.apply_batch(ops)
+        return
+    buf = np.stack([frame._px for frame in frames])
+    _render_frames(buf, np.array(rows, np.int64).reshape(-1, 7))
+    for frame, px, ops in zip(frames, buf, ops_per_frame):
+        if ops:
+            frame._px[:, :] = px
+            frame._notify_change()
+
+
+def _warm_kernels() -> None:
+    # Compile the Numba kernels at import so the first draw call does not stall.
+    # _render_frames is left to compile on first use: it is only needed for
+    # multi-frame batches and would start the thread pool on every import.
+    px = np.zeros((FRAME_HEIGHT, FRAME_WIDTH), "<u2")
+    _bresenham(px, 0, 0, 1, 1, 0)
+    _flood(px, 0, 0, 1)
+    points = np.zeros(2, np.int64)
+    _oval(px, 0, 0, 1, 1, 0)
+    _polyline(px, points, points, 0)
+
+
+if HAVE_NUMBA:
+    _warm_kernels()
+
+
+# QGC1: zlib-compressed JSON {"w", "h", "pixels"} (legacy, still readable).
+# QGC2: "<HH" width/height header followed by the zlib-compressed r, g and b
+#       planes, each stored row-major as uint8.
 QGC_MAGIC = b"QGC1"
+QGC_MAGIC_V2 = b"QGC2"
 
 
-def saveQGC(frame: Frame, path: str) -> None:
-    import json
+def encode_qgc(frame: Frame) -> bytes:
+    import struct
     import zlib
 
-    payload = {
-        "w": 64,
-        "h": 32,
-        "pixels": frame.display,
-    }
-    raw = json.dumps(payload).encode("utf-8")
-    compressed = zlib.compress(raw, level=6)
-    with open(path, "wb") as f:
-        f.write(QGC_MAGIC + compressed)
+    header = QGC_MAGIC_V2 + struct.pack("<HH", FRAME_WIDTH, FRAME_HEIGHT)
+    planes = np.stack(_unpack565(frame._px)).astype(np.uint8).tobytes()
+    return header + zlib.compress(planes, level=6)
 
 
-def loadQGC(path: str) -> Frame:
+def decode_qgc(data: bytes) -> Frame:
     import json
+    import struct
     import zlib
 
-    data = open(path, "rb").read()
+    if data.startswith(QGC_MAGIC_V2):
+        w, h = struct.unpack_from("<HH", data, len(QGC_MAGIC_V2))
+        if w != FRAME_WIDTH or h != FRAME_HEIGHT:
+            raise ValueError("Unsupported frame size")
+        raw = zlib.decompress(data[len(QGC_MAGIC_V2) + 4:])
+        if len(raw) != 3 * FRAME_WIDTH * FRAME_HEIGHT:
+            raise ValueError("Invalid .qgc file")
+        planes = np.frombuffer(raw, np.uint8).reshape(3, FRAME_HEIGHT, FRAME_WIDTH)
+        frame = Frame()
+        frame._px[:, :] = _pack565(planes[0].astype(np.uint16), planes[1].astype(np.uint16), planes[2].astype(np.uint16))
+        return frame
     if not data.startswith(QGC_MAGIC):
         raise ValueError("Invalid .qgc file")
     raw = zlib.decompress(data[len(QGC_MAGIC):])
@@ -213,24 +497,22 @@ def loadQGC(path: str) -> Frame:
     return Frame(payload.get("pixels"))
 
 
-def frame_to_rgb565_bytes(frame: Frame) -> bytes:
-    if len(frame.display) != 32:
-        raise ValueError("Frame must have 32 rows")
-    for row in frame.display:
-        if len(row) != 64:
-            raise ValueError("Frame rows must have 64 pixels")
-
-    data = bytearray(64 * 32 * 2)
-    idx = 0
-    for y in range(32):
-        row = frame.display[y]
-        for x in range(64):
-            r, g, b = row[x]
-            value = ((int(r) & 0x1F) << 11) | ((int(g) & 0x3F) << 5) | (int(b) & 0x1F)
-            data[idx] = value & 0xFF
-            data[idx + 1] = (value >> 8) & 0xFF
-            idx += 2
-    return bytes(data)
+def saveQGC(frame: Frame, path: str) -> None:
+    with open(path, "wb") as f:
+        f.write(encode_qgc(frame))
+
+
+def loadQGC(path: str) -> Frame:
+    with open(path, "rb") as f:
+        data = f.read()
+    return decode_qgc(data)
+
+
+def frame_to_rgb565_bytes(frame: Frame) -> memoryview:
+    # Zero-copy, read-only view of the frame's RGB565 buffer. It aliases the
+    # frame, so later edits show through: finish using it (or take bytes() of
+    # it) before drawing to the frame again.
+    return memoryview(frame._px).toreadonly().cast("B")
 
 
 def _default_send_target() -> tuple[str, int]:
@@ -0,0 +1,24 @@
+"""Optional Numba support for the engine's pixel kernels.
+
+When Numba is installed, ``njit`` compiles the decorated function; otherwise
+it returns the function unchanged so the kernels run as plain Python.
+"""
+
+from __future__ import annotations
+
+try:
+    from numba import njit, prange
+
+    HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - depends on the environment
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+    prange = range
+
+
+__all__ = ["HAVE_NUMBA", "njit", "prange"]
@@ -0,0 +1,262 @@
+"""Token tables and the compiled block tokenizer for QGHighlighter.
+
+``tokenize`` mirrors the pure-Python scanner in ``QGHighlighter`` over an
+ASCII byte buffer and emits (start, length, kind) runs; the highlighter maps
+each kind to a format. Without Numba it is not used.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from Engine.jit import HAVE_NUMBA, njit
+
+
+# Character classes, indexed by the ASCII code point.
+(
+    CC_OTHER,
+    CC_IDENT,
+    CC_DIGIT,
+    CC_COMMENT,
+    CC_STRING,
+    CC_OPEN,
+    CC_CLOSE,
+    CC_OP,
+    CC_BANG,
+    CC_DOT,
+    CC_COLON,
+) = range(11)
+
+
+def _build_char_class() -> bytes:
+    table = bytearray(128)
+    for ch in "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_":
+        table[ord(ch)] = CC_IDENT
+    for ch in "0123456789":
+        table[ord(ch)] = CC_DIGIT
+    for chars, cls in (
+        ("%", CC_COMMENT),
+        ('"', CC_STRING),
+        ("([{<", CC_OPEN),
+        (")]}>", CC_CLOSE),
+        ("=+-*&|~?", CC_OP),
+        ("!", CC_BANG),
+        (".", CC_DOT),
+        (":", CC_COLON),
+    ):
+        for ch in chars:
+            table[ord(ch)] = cls
+    return bytes(table)
+
+
+CHAR_CLASS = _build_char_class()
+_CHAR_CLASS_ARR = np.frombuffer(CHAR_CLASS, np.uint8)
+
+# Format codes: indices into QGHighlighter._fmts. FMT_BRACKET + depth (0-2)
+# selects a bracket colour. KIND_WORD marks a plain identifier whose format
+# depends on the word itself (keyword, type, ...), resolved by the caller.
+(
+    FMT_DEFAULT,
+    FMT_KEYWORD,
+    FMT_TYPE,
+    FMT_BOOL,
+    FMT_LITERAL,
+    FMT_CONST,
+    FMT_FUNC,
+    FMT_PUNCT,
+    FMT_INT,
+    FMT_STRING,
+    FMT_OP,
+    FMT_COMMENT,
+    FMT_BLOCK_CLOSER,
+    FMT_BRACKET,
+) = range(14)
+KIND_WORD = FMT_BRACKET + 3
+
+STATE_IN_COMMENT = 0x1
+STATE_DEPTH_SHIFT = 1
+
+
+@njit(cache=True, boundscheck=False)
+def _is_space(c):
+    # str.isspace() for ASCII.
+    return c == 32 or 9 <= c <= 13 or 28 <= c <= 31
+
+
+@njit(cache=True, boundscheck=False)
+def _is_word(c):
+    return _CHAR_CLASS_ARR[c] == CC_IDENT or _CHAR_CLASS_ARR[c] == CC_DIGIT
+
+
+@njit(cache=True, boundscheck=False)
+def _skip_space(buf, i):
+    while i < buf.shape[0] and _is_space(buf[i]):
+        i += 1
+    return i
+
+
+@njit(cache=True, boundscheck=False)
+def _is_func_decl(buf, i):
+    # True if buf[i:] continues a declaration name: "{...} => <type> :".
+    length = buf.shape[0]
+    i = _skip_space(buf, i)
+    if i >= length or buf[i] != 123:  # {
+        return False
+    i += 1
+    while i < length and buf[i] != 125:  # }
+        i += 1
+    if i >= length:
+        return False
+    i = _skip_space(buf, i + 1)
+    if i + 1 >= length or buf[i] != 61 or buf[i + 1] != 62:  # =>
+        return False
+    i = _skip_space(buf, i + 2)
+    if i >= length or _CHAR_CLASS_ARR[buf[i]] != CC_IDENT:
+        return False
+    i += 1
+    while i < length and _is_word(buf[i]):
+        i += 1
+    i = _skip_space(buf, i)
+    return i < length and buf[i] == 58  # :
+
+
+@njit(cache=True, boundscheck=False)
+def tokenize(buf, state, out_start, out_len, out_kind):
+    # Scan one ASCII block starting from the previous block's state. Fills
+    # the out_* arrays (each at least len(buf) long) and returns the number
+    # of runs and the block's end state.
+    length = buf.shape[0]
+    depth = (state >> STATE_DEPTH_SHIFT) & 0x3
+    in_comment = (state & STATE_IN_COMMENT) != 0
+    n = 0
+    i = 0
+    prev_do = False
+    prev_end = -1
+    decl_found = False
+    while i < length:
+        c = buf[i]
+        if in_comment or c == 37:  # %
+            j = i if in_comment else i + 1
+            while j < length and buf[j] != 37:
+                j += 1
+            if j >= length:
+                out_start[n] = i
+                out_len[n] = length - i
+                out_kind[n] = FMT_COMMENT
+                return n + 1, STATE_IN_COMMENT | (depth << STATE_DEPTH_SHIFT)
+            out_start[n] = i
+            out_len[n] = j - i + 1
+            out_kind[n] = FMT_COMMENT
+            n += 1
+            i = j + 1
+            in_comment = False
+            continue
+
+        cls = _CHAR_CLASS_ARR[c] if c < 128 else CC_OTHER
+        if cls == CC_OTHER:
+            i += 1
+            continue
+
+        start = i
+        kind = FMT_DEFAULT
+        if cls == CC_IDENT:
+            j = i + 1
+            while j < length and _is_word(buf[j]):
+                j += 1
+            at_word_start = i == 0 or not _is_word(buf[i - 1])
+            is_func = False
+            if not decl_found and at_word_start:
+                is_func = decl_found = _is_func_decl(buf, j)
+            if prev_do and prev_end < i:
+                gap = True
+                for k in range(prev_end, i):
+                    if not _is_space(buf[k]):
+                        gap = False
+                        break
+                if gap:
+                    k = _skip_space(buf, j)
+                    if k < length and buf[k] == 123:  # {
+                        is_func = True
+            if is_func:
+                kind = FMT_FUNC
+            elif 65 <= c <= 90:
+                kind = FMT_CONST
+                for k in range(i + 1, j):
+                    if 97 <= buf[k] <= 122:
+                        kind = KIND_WORD
+                        break
+            else:
+                kind = KIND_WORD
+            prev_do = at_word_start and j - i == 2 and c == 68 and buf[i + 1] == 111  # Do
+            prev_end = j
+            i = j
+        elif cls == CC_STRING:
+            j = i + 1
+            while j < length:
+                if buf[j] == 92 and j + 1 < length:  # backslash
+                    j += 2
+                    continue
+                if buf[j] == 34:  # "
+                    j += 1
+                    break
+                j += 1
+            kind = FMT_STRING
+            i = j
+        elif cls == CC_DIGIT:
+            j = i + 1
+            while j < length and 48 <= buf[j] <= 57:
+                j += 1
+            kind = FMT_INT
+            i = j
+        elif cls == CC_OPEN:
+            if c == 60 and i + 1 < length and buf[i + 1] == 61:  # <=
+                kind = FMT_OP
+                i += 2
+            else:
+                kind = FMT_BRACKET + depth
+                depth = (depth + 1) % 3
+                i += 1
+        elif cls == CC_CLOSE:
+            if c == 62 and i + 1 < length and buf[i + 1] == 61:  # >=
+                kind = FMT_OP
+                i += 2
+            else:
+                depth = (depth + 2) % 3
+                kind = FMT_BRACKET + depth
+                i += 1
+        elif cls == CC_OP:
+            if i + 1 < length and ((c == 45 and buf[i + 1] == 62) or (c == 61 and buf[i + 1] == 61)):  # -> ==
+                i += 2
+            else:
+                i += 1
+            kind = FMT_OP
+        elif cls == CC_BANG:
+            kind = FMT_BLOCK_CLOSER
+            i += 1
+            if i < length and buf[i] == 63:  # ?
+                out_start[n] = start
+                out_len[n] = 1
+                out_kind[n] = kind
+                n += 1
+                start = i
+                kind = FMT_PUNCT
+                i += 1
+        elif cls == CC_DOT:
+            i += 1
+        else:  # CC_COLON
+            kind = FMT_PUNCT
+            i += 1
+        out_start[n] = start
+        out_len[n] = i - start
+        out_kind[n] = kind
+        n += 1
+
+    # Only reachable in a comment when the block is empty.
+    return n, (STATE_IN_COMMENT if in_comment else 0) | (depth << STATE_DEPTH_SHIFT)
+
+
+if HAVE_NUMBA:
+    _buf = np.zeros(1, np.uint8)
+    _out = np.empty(1, np.int32)
+    tokenize(_buf, 0, _out, _out, np.empty(1, np.uint8))
+    del _buf, _out
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from dataclasses import dataclass
+import os
 from pathlib import Path
 import re
+import stat
+import time
 
-from PyQt5.QtCore import QRect, QSize, Qt, QTimer
-from PyQt5.QtGui import QColor, QFont, QPainter, QTextCharFormat, QTextFormat, QSyntaxHighlighter, QKeySequence
+import numpy as np
+from PyQt5.QtCore import QEvent, QObject, QPointF, QRect, QRunnable, QSize, Qt, QThreadPool, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QFontMetricsF, QPainter, QStaticText, QTextBlock, QTextCharFormat, QTextCursor, QTextFormat, QSyntaxHighlighter, QKeySequence
 from PyQt5.QtWidgets import (
+    QApplication,
     QFileDialog,
     QFrame,
     QHBoxLayout,
@@ -26,6 +32,29 @@ from PyQt5.QtWidgets import (
     QStyle,
 )
 
+from Engine.jit import HAVE_NUMBA
+from GUI._hl_tok import (
+    CC_BANG,
+    CC_CLOSE,
+    CC_DIGIT,
+    CC_DOT,
+    CC_IDENT,
+    CC_OP,
+    CC_OPEN,
+    CC_OTHER,
+    CC_STRING,
+    CHAR_CLASS,
+    FMT_BOOL,
+    FMT_CONST,
+    FMT_DEFAULT,
+    FMT_FUNC,
+    FMT_KEYWORD,
+    FMT_LITERAL,
+    FMT_TYPE,
+    KIND_WORD,
+    tokenize,
+)
+
 
 # Chrome color scheme (exact values per spec)
 APP_BG = "#0F111A"
@@ -75,16 +104,221 @@ BREAKPOINT = "#F7768E"
 
 BRACKET_COLORS = ["#89DDFF", "#BB9AF7", "#9ECE6A"]
 
+# Formatted once at import; the editor rule lives in the widget's sheet and
+# reaches every CodeEditor tab through stylesheet inheritance.
+_APP_STYLESHEET = f"""
+    QWidget {{
+        background: {APP_BG};
+        color: {ACTIVE_TAB_TEXT};
+        font-family: Segoe UI, Arial;
+        font-size: 11px;
+    }}
+
+    /* Tabs (top bar) */
+    QTabWidget::pane {{
+        border: none;
+    }}
+    QTabBar {{
+        background: {TOP_BAR_BG};
+    }}
+    QTabBar::tab {{
+        background: {TOP_BAR_BG};
+        color: {INACTIVE_TAB_TEXT};
+        padding: 8px 12px;
+        margin-right: 2px;
+        border: 1px solid {DIVIDER};
+        border-bottom: none;
+    }}
+    QTabBar::tab:selected {{
+        background: {ACTIVE_TAB_BG};
+        color: {ACTIVE_TAB_TEXT};
+    }}
+    QTabBar::close-button {{
+        image: none;
+    }}
+    QTabWidget QToolButton {{
+        background: {TOP_BAR_BG};
+        color: {ACTIVE_TAB_TEXT};
+        border: 1px solid {DIVIDER};
+        padding: 4px 10px;
+    }}
+    QTabWidget QToolButton:hover {{
+        background: {ACTIVE_TAB_BG};
+    }}
+
+    /* Toolbar */
+    #codeToolbar {{
+        background: {TOP_BAR_BG};
+        border-bottom: 1px solid {DIVIDER};
+    }}
+    #runButton {{
+        background: {RUN_BG};
+        color: {RUN_TEXT};
+        border: 1px solid {DIVIDER};
+        padding: 6px 10px;
+    }}
+    #runButton:hover {{
+        background: {RUN_HOVER};
+    }}
+    #debugButton {{
+        background: {DEBUG_BG};
+        color: {DEBUG_TEXT};
+        border: 1px solid {DIVIDER};
+        padding: 6px 10px;
+    }}
+    #debugButton:hover {{
+        background: {DEBUG_HOVER};
+    }}
+    #stepButton, #continueButton {{
+        background: {SAVE_BG};
+        color: {SAVE_TEXT};
+        border: 1px solid {DIVIDER};
+        padding: 6px 10px;
+    }}
+    #stepButton:hover, #continueButton:hover {{
+        background: {SAVE_HOVER};
+    }}
+    #liveButton {{
+        background: {LIVE_BG};
+        color: {LIVE_TEXT};
+        border: 1px solid {DIVIDER};
+        padding: 6px 10px;
+    }}
+    #liveButton:hover {{
+        background: {LIVE_HOVER};
+    }}
+    #saveButton {{
+        background: {SAVE_BG};
+        color: {SAVE_TEXT};
+        border: 1px solid {DIVIDER};
+        padding: 6px 12px;
+    }}
+    #saveButton:hover {{
+        background: {SAVE_HOVER};
+    }}
+    #loadButton {{
+        background: {LOAD_BG};
+        color: {LOAD_TEXT};
+        border: 1px solid {DIVIDER};
+        padding: 6px 12px;
+    }}
+    #loadButton:hover {{
+        background: {LOAD_HOVER};
+    }}
+    #liveSpeed {{
+        background: {TOP_BAR_BG};
+    }}
+    #liveSpeedLabel {{
+        color: {INACTIVE_TAB_TEXT};
+        padding-left: 4px;
+    }}
+
+    /* Splitter divider */
+    QSplitter::handle {{
+        background: {DIVIDER};
+    }}
+
+    /* API panel */
+    #apiPanel {{
+        background: {SIDEBAR_BG};
+        border-left: 1px solid {DIVIDER};
+        min-width: 280px;
+    }}
+    #apiTitle {{
+        font-size: 13px;
+        font-weight: 600;
+        color: {ACTIVE_TAB_TEXT};
+    }}
+    #apiBody {{
+        color: {INACTIVE_TAB_TEXT};
+    }}
+
+    /* Editor */
+    QPlainTextEdit {{
+        background: {EDITOR_BG};
+        color: {ACTIVE_TAB_TEXT};
+        border: 1px solid {DIVIDER};
+    }}
+    """
+
+
+# Script dialogs skip per-entry icon lookups and symlink resolution, which
+# stat every file and make large or network directories slow to list.
+_FILE_DIALOG_OPTIONS = QFileDialog.DontUseCustomDirectoryIcons | QFileDialog.DontResolveSymlinks
+
+# Scripts longer than this are loaded into the editor in pieces of about
+# this many characters, one per event-loop pass.
+_LOAD_CHUNK_CHARS = 64 * 1024
+
+# Highlighting within one event-loop pass stops spilling into later blocks
+# after this many seconds; the rest of such a change (an opened comment, say)
+# is finished from the event loop in slices of the same length.
+_HIGHLIGHT_SLICE_S = 0.008
+# Shortest gap between live-preview repaints while a program runs: about one
+# display refresh, so statement-end frames beyond that rate are dropped.
+_PREVIEW_INTERVAL_MS = 16
+
+# Bracket depth cycles through the three BRACKET_COLORS.
+_NEXT3 = (1, 2, 0)
+_PREV3 = (2, 0, 1)
+
+_RE_WHILE_OPENER = re.compile(r"^\s*While\b.*\)\s*$")
+_CONTINUATION_END = frozenset("=+-*&|<>({[")
+_AUTO_PAIRS = {"(": ")", "[": "]", "{": "}", '"': '"'}
+_IDENT_START = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_")
+_IDENT_CHARS = _IDENT_START | frozenset("0123456789")
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _next_non_space(text: str, i: int) -> str:
+    length = len(text)
+    while i < length and text[i].isspace():
+        i += 1
+    return text[i] if i < length else ""
+
+
+def _is_func_decl(text: str, i: int) -> bool:
+    # True if text[i:] continues a declaration name: "{...} => <type> :".
+    length = len(text)
+    while i < length and text[i].isspace():
+        i += 1
+    if i >= length or text[i] != "{":
+        return False
+    i = text.find("}", i + 1)
+    if i == -1:
+        return False
+    i += 1
+    while i < length and text[i].isspace():
+        i += 1
+    if not text.startswith("=>", i):
+        return False
+    i += 2
+    while i < length and text[i].isspace():
+        i += 1
+    if i >= length or text[i] not in _IDENT_START:
+        return False
+    i += 1
+    while i < length and text[i] in _IDENT_CHARS:
+        i += 1
+    return _next_non_space(text, i) == ":"
+
 
 class QGHighlighter(QSyntaxHighlighter):
     STATE_IN_COMMENT = 0x1
     STATE_DEPTH_SHIFT = 1
     STATE_DEPTH_MASK = 0x6
 
-    def __init__(self, document):
-        super().__init__(document)
+    # Formats and word tables are the same for every document, so the first
+    # highlighter builds them as class attributes and later ones (one per
+    # editor tab) reuse them.
+    _fmts: list[QTextCharFormat] | None = None
 
-        self.keyword_set = {
+    @classmethod
+    def _build_formats(cls) -> None:
+        keyword_set = {
             "Do",
             "Publish",
             "Send",
@@ -101,186 +335,298 @@ class QGHighlighter(QSyntaxHighlighter):
             "false",
             "none",
         }
-        self.type_set = {"Frame", "int", "color", "pixel", "bool", "string", "list", "None"}
-        self.bool_ops = {"and", "or", "xor", "not"}
-        self.literal_set = {"true", "false", "none"}
-
-        self.fmt_default = self._make_format(DEFAULT_TEXT)
-        self.fmt_punct = self._make_format(PUNCTUATION)
-        self.fmt_keyword = self._make_format(KEYWORD)
-        self.fmt_type = self._make_format(TYPE)
-        self.fmt_bool = self._make_format(BOOL_OP)
-        self.fmt_int = self._make_format(INT_LIT)
-        self.fmt_string = self._make_format(STRING_LIT)
-        self.fmt_literal = self._make_format(LITERAL)
-        self.fmt_func = self._make_format(FUNC_NAME)
-        self.fmt_const = self._make_format(CONSTANT)
-        self.fmt_op = self._make_format(OPERATOR)
-        self.fmt_comment = self._make_format(COMMENT, italic=True)
-        self.fmt_block_closer = self._make_format(BLOCK_CLOSER)
-
-        self.fmt_brackets = [self._make_format(c) for c in BRACKET_COLORS]
-
-        self._re_ident = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
-        self._re_const = re.compile(r"[A-Z][A-Z0-9_]*")
-
-    def _make_format(self, color_hex: str, italic: bool = False) -> QTextCharFormat:
+        type_set = {"Frame", "int", "color", "pixel", "bool", "string", "list", "None"}
+        bool_ops = {"and", "or", "xor", "not"}
+        literal_set = {"true", "false", "none"}
+
+        cls.fmt_default = cls._make_format(DEFAULT_TEXT)
+        cls.fmt_punct = cls._make_format(PUNCTUATION)
+        cls.fmt_keyword = cls._make_format(KEYWORD)
+        cls.fmt_type = cls._make_format(TYPE)
+        cls.fmt_bool = cls._make_format(BOOL_OP)
+        cls.fmt_int = cls._make_format(INT_LIT)
+        cls.fmt_string = cls._make_format(STRING_LIT)
+        cls.fmt_literal = cls._make_format(LITERAL)
+        cls.fmt_func = cls._make_format(FUNC_NAME)
+        cls.fmt_const = cls._make_format(CONSTANT)
+        cls.fmt_op = cls._make_format(OPERATOR)
+        cls.fmt_comment = cls._make_format(COMMENT, italic=True)
+        cls.fmt_block_closer = cls._make_format(BLOCK_CLOSER)
+
+        cls.fmt_brackets = [cls._make_format(c) for c in BRACKET_COLORS]
+
+        # Formats indexed by the FMT_* codes from GUI._hl_tok. In the word
+        # table later sets win, so literal > bool > type > keyword.
+        cls._fmts = [
+            cls.fmt_default,
+            cls.fmt_keyword,
+            cls.fmt_type,
+            cls.fmt_bool,
+            cls.fmt_literal,
+            cls.fmt_const,
+            cls.fmt_func,
+            cls.fmt_punct,
+            cls.fmt_int,
+            cls.fmt_string,
+            cls.fmt_op,
+            cls.fmt_comment,
+            cls.fmt_block_closer,
+            *cls.fmt_brackets,
+        ]
+        word_fmt_idx = (
+            dict.fromkeys(keyword_set, FMT_KEYWORD)
+            | dict.fromkeys(type_set, FMT_TYPE)
+            | dict.fromkeys(bool_ops, FMT_BOOL)
+            | dict.fromkeys(literal_set, FMT_LITERAL)
+        )
+        # Bucketed by word length: most user identifiers have a length no
+        # special word has, so they skip the slice and hash entirely.
+        by_len: list[dict[str, int] | None] = [None] * (max(map(len, word_fmt_idx)) + 1)
+        for word, idx in word_fmt_idx.items():
+            if by_len[len(word)] is None:
+                by_len[len(word)] = {}
+            by_len[len(word)][word] = idx
+        cls._word_fmt_by_len = by_len
+
+    def __init__(self, document):
+        super().__init__(document)
+
+        if QGHighlighter._fmts is None:
+            QGHighlighter._build_formats()
+
+        # Output runs for the compiled tokenizer; grown to the longest block.
+        self._tok_start = np.empty(256, np.int32)
+        self._tok_len = np.empty(256, np.int32)
+        self._tok_kind = np.empty(256, np.uint8)
+
+        # End of the current time slice (None between slices), cursors at
+        # blocks whose end state could not be passed on within one, and
+        # whether the next block is one of those being resumed (which always
+        # passes its state on, so every slice makes progress).
+        self._slice_end: float | None = None
+        self._stale: list[QTextCursor] = []
+        self._resuming = False
+        self._slice_timer = QTimer(self)
+        self._slice_timer.setSingleShot(True)
+        self._slice_timer.setInterval(0)
+        self._slice_timer.timeout.connect(self._next_slice)
+
+    def _highlight_compiled(self, text: str, prev_state: int) -> None:
+        if len(text) > len(self._tok_kind):
+            size = max(len(text), 2 * len(self._tok_kind))
+            self._tok_start = np.empty(size, np.int32)
+            self._tok_len = np.empty(size, np.int32)
+            self._tok_kind = np.empty(size, np.uint8)
+        buf = np.frombuffer(text.encode("ascii"), np.uint8)
+        n, state = tokenize(buf, prev_state, self._tok_start, self._tok_len, self._tok_kind)
+        set_format = self.setFormat
+        fmts = self._fmts
+        by_len = self._word_fmt_by_len
+        max_len = len(by_len)
+        for start, size, kind in zip(
+            self._tok_start[:n].tolist(), self._tok_len[:n].tolist(), self._tok_kind[:n].tolist()
+        ):
+            if kind == KIND_WORD:
+                bucket = by_len[size] if size < max_len else None
+                kind = bucket.get(text[start : start + size], FMT_DEFAULT) if bucket else FMT_DEFAULT
+            set_format(start, size, fmts[kind])
+        self.setCurrentBlockState(state)
+
+    @staticmethod
+    def _make_format(color_hex: str, italic: bool = False) -> QTextCharFormat:
         fmt = QTextCharFormat()
         fmt.setForeground(QColor(color_hex))
         fmt.setFontItalic(italic)
         return fmt
 
     def highlightBlock(self, text: str) -> None:
+        if self._slice_end is None:
+            self._slice_end = time.perf_counter() + _HIGHLIGHT_SLICE_S
+            self._slice_timer.start()
+        before = self.currentBlockState()
+        self._highlight_block(text)
+        if self._resuming:
+            self._resuming = False
+            return
+        # Qt goes on to the next block whenever this one's state changed.
+        # Blocks that already had a state are past the edited text, so once
+        # the slice is used up, keep the old state to stop Qt here and pick
+        # the block up again in a later slice.
+        if before >= 0 and self.currentBlockState() != before and time.perf_counter() > self._slice_end:
+            self.setCurrentBlockState(before)
+            self._stale.append(QTextCursor(self.currentBlock()))
+
+    def _next_slice(self) -> None:
+        self._slice_end = None
+        stale = self._stale
+        if not stale:
+            return
+        doc = self.document()
+        stale.sort(key=QTextCursor.position)
+        while stale and (self._slice_end is None or time.perf_counter() < self._slice_end):
+            cursor = stale.pop(0)
+            # Cursors follow edits; one left on a replaced document is dropped.
+            if cursor.document() is doc:
+                self._resuming = True
+                self.rehighlightBlock(cursor.block())
+                self._resuming = False
+
+    def _highlight_block(self, text: str) -> None:
         prev_state = self.previousBlockState()
         if prev_state < 0:
             prev_state = 0
+        # The compiled tokenizer works on bytes, so it is only used when byte
+        # offsets and Qt's UTF-16 offsets agree, i.e. for ASCII blocks.
+        if HAVE_NUMBA and text.isascii():
+            self._highlight_compiled(text, prev_state)
+            return
         in_comment = bool(prev_state & self.STATE_IN_COMMENT)
         depth_mod = (prev_state >> self.STATE_DEPTH_SHIFT) & 0x3
 
-        func_decl_ranges = self._find_func_decl_ranges(text)
-        func_call_ranges = self._find_func_call_ranges(text)
+        set_format = self.setFormat
+        fmt_default = self.fmt_default
+        fmt_string = self.fmt_string
+        fmt_int = self.fmt_int
+        fmt_comment = self.fmt_comment
+        fmt_op = self.fmt_op
+        fmt_punct = self.fmt_punct
+        fmt_block_closer = self.fmt_block_closer
+        fmt_brackets = self.fmt_brackets
+        fmts = self._fmts
+        by_len = self._word_fmt_by_len
+        max_len = len(by_len)
+        char_class = CHAR_CLASS
 
         i = 0
         length = len(text)
-
-        def is_in_ranges(start: int, end: int, ranges: list[tuple[int, int]]) -> bool:
-            for a, b in ranges:
-                if start >= a and end <= b:
-                    return True
-            return False
+        # Function names are spotted as identifiers are emitted: a call is
+        # "Do <name> {", a declaration is "<name> {...} => <type> :" (only the
+        # first one on a line).
+        prev_word = ""
+        prev_word_end = -1
+        decl_found = False
 
         while i < length:
-            if in_comment:
-                end = text.find("%", i)
+            # A comment carried over from the previous block, or one opened
+            # here; both run to the next "%" or the end of the block.
+            if in_comment or text[i] == "%":
+                end = text.find("%", i if in_comment else i + 1)
                 if end == -1:
-                    self.setFormat(i, length - i, self.fmt_comment)
+                    set_format(i, length - i, fmt_comment)
                     self.setCurrentBlockState(self.STATE_IN_COMMENT | (depth_mod << self.STATE_DEPTH_SHIFT))
                     return
-                self.setFormat(i, end - i + 1, self.fmt_comment)
+                set_format(i, end - i + 1, fmt_comment)
                 i = end + 1
                 in_comment = False
                 continue
 
             ch = text[i]
+            code = ord(ch)
+            if code < 128:
+                cls = char_class[code]
+            else:
+                cls = CC_DIGIT if ch.isdigit() else CC_OTHER
 
-            # Comment start
-            if ch == "%":
-                end = text.find("%", i + 1)
-                if end == -1:
-                    self.setFormat(i, length - i, self.fmt_comment)
-                    self.setCurrentBlockState(self.STATE_IN_COMMENT | (depth_mod << self.STATE_DEPTH_SHIFT))
-                    return
-                self.setFormat(i, end - i + 1, self.fmt_comment)
-                i = end + 1
-                continue
+            if cls == CC_OTHER:
+                i += 1
 
-            # String literal
-            if ch == '"':
+            elif cls == CC_IDENT:
                 j = i + 1
-                while j < length:
-                    if text[j] == "\\" and j + 1 < length:
-                        j += 2
-                        continue
-                    if text[j] == '"':
-                        j += 1
-                        break
+                while j < length and text[j] in _IDENT_CHARS:
                     j += 1
-                self.setFormat(i, j - i, self.fmt_string)
+                word = text[i:j]
+                at_word_start = i == 0 or not _is_word_char(text[i - 1])
+                is_func = False
+                if not decl_found and at_word_start:
+                    is_func = decl_found = _is_func_decl(text, j)
+                if (
+                    prev_word == "Do"
+                    and prev_word_end < i
+                    and text[prev_word_end:i].isspace()
+                    and _next_non_space(text, j) == "{"
+                ):
+                    is_func = True
+                if is_func:
+                    idx = FMT_FUNC
+                else:
+                    bucket = by_len[j - i] if j - i < max_len else None
+                    idx = bucket.get(word) if bucket else None
+                    if idx is None:
+                        idx = FMT_CONST if word.isupper() and "A" <= word[0] <= "Z" else FMT_DEFAULT
+                set_format(i, j - i, fmts[idx])
+                prev_word = word if at_word_start else ""
+                prev_word_end = j
                 i = j
-                continue
 
-            # Integer literal
-            if ch.isdigit():
+            elif cls == CC_STRING:
+                # The closing-quote search only restarts when an escape has
+                # swallowed the quote found so far, so each character is
+                # scanned once however many escapes the string holds.
+                j = i + 1
+                quote = text.find('"', j)
+                while True:
+                    stop = length if quote == -1 else quote
+                    escape = text.find("\\", j, stop)
+                    if escape == -1:
+                        j = length if quote == -1 else quote + 1
+                        break
+                    j = min(escape + 2, length)
+                    if quote != -1 and quote < j:
+                        quote = text.find('"', j)
+                set_format(i, j - i, fmt_string)
+                i = j
+
+            elif cls == CC_DIGIT:
                 j = i + 1
                 while j < length and text[j].isdigit():
                     j += 1
-                self.setFormat(i, j - i, self.fmt_int)
+                set_format(i, j - i, fmt_int)
                 i = j
-                continue
 
-            # Identifier / keyword / type
-            if ch.isalpha() or ch == "_":
-                m = self._re_ident.match(text, i)
-                if m:
-                    word = m.group(0)
-                    start, end = m.start(), m.end()
-                    if is_in_ranges(start, end, func_decl_ranges) or is_in_ranges(start, end, func_call_ranges):
-                        self.setFormat(start, end - start, self.fmt_func)
-                    elif word in self.literal_set:
-                        self.setFormat(start, end - start, self.fmt_literal)
-                    elif word in self.bool_ops:
-                        self.setFormat(start, end - start, self.fmt_bool)
-                    elif word in self.type_set:
-                        self.setFormat(start, end - start, self.fmt_type)
-                    elif word in self.keyword_set:
-                        self.setFormat(start, end - start, self.fmt_keyword)
-                    elif self._re_const.fullmatch(word):
-                        self.setFormat(start, end - start, self.fmt_const)
-                    else:
-                        self.setFormat(start, end - start, self.fmt_default)
-                    i = end
-                    continue
-
-            # Operators and delimiters
-            two = text[i : i + 2]
-            if two in {"->", "==", "<=", ">=", "!?"}:
-                if two == "!?":
-                    self.setFormat(i, 1, self.fmt_block_closer)
-                    self.setFormat(i + 1, 1, self.fmt_punct)
+            elif cls == CC_OPEN:
+                if ch == "<" and text.startswith("=", i + 1):
+                    set_format(i, 2, fmt_op)
+                    i += 2
                 else:
-                    self.setFormat(i, 2, self.fmt_op)
-                i += 2
-                continue
-
-            if ch in "(){}[]<>":
-                if ch in "([{<":
-                    self.setFormat(i, 1, self.fmt_brackets[depth_mod])
-                    depth_mod = (depth_mod + 1) % 3
+                    set_format(i, 1, fmt_brackets[depth_mod])
+                    depth_mod = _NEXT3[depth_mod]
+                    i += 1
+
+            elif cls == CC_CLOSE:
+                if ch == ">" and text.startswith("=", i + 1):
+                    set_format(i, 2, fmt_op)
+                    i += 2
                 else:
-                    depth_mod = (depth_mod - 1) % 3
-                    self.setFormat(i, 1, self.fmt_brackets[depth_mod])
-                i += 1
-                continue
-
-            if ch == "!":
-                self.setFormat(i, 1, self.fmt_block_closer)
-                i += 1
-                continue
-
-            if ch == ".":
-                self.setFormat(i, 1, self.fmt_default)
-                i += 1
-                continue
+                    depth_mod = _PREV3[depth_mod]
+                    set_format(i, 1, fmt_brackets[depth_mod])
+                    i += 1
+
+            elif cls == CC_OP:
+                if (ch == "-" and text.startswith(">", i + 1)) or (ch == "=" and text.startswith("=", i + 1)):
+                    set_format(i, 2, fmt_op)
+                    i += 2
+                else:
+                    set_format(i, 1, fmt_op)
+                    i += 1
+
+            elif cls == CC_BANG:
+                set_format(i, 1, fmt_block_closer)
+                if text.startswith("?", i + 1):
+                    set_format(i + 1, 1, fmt_punct)
+                    i += 2
+                else:
+                    i += 1
 
-            if ch == ":":
-                self.setFormat(i, 1, self.fmt_punct)
+            elif cls == CC_DOT:
+                set_format(i, 1, fmt_default)
                 i += 1
-                continue
 
-            if ch in "=+-*&|~<>?":
-                self.setFormat(i, 1, self.fmt_op)
+            else:  # CC_COLON
+                set_format(i, 1, fmt_punct)
                 i += 1
-                continue
-
-            i += 1
 
         self.setCurrentBlockState((self.STATE_IN_COMMENT if in_comment else 0) | (depth_mod << self.STATE_DEPTH_SHIFT))
 
-    def _find_func_decl_ranges(self, text: str) -> list[tuple[int, int]]:
-        ranges: list[tuple[int, int]] = []
-        m = re.search(r"\b([A-Za-z_][A-Za-z0-9_]*)\s*\{[^}]*\}\s*=>\s*[A-Za-z_][A-Za-z0-9_]*\s*:", text)
-        if m:
-            start = m.start(1)
-            end = m.end(1)
-            ranges.append((start, end))
-        return ranges
-
-    def _find_func_call_ranges(self, text: str) -> list[tuple[int, int]]:
-        ranges: list[tuple[int, int]] = []
-        for m in re.finditer(r"\bDo\s+([A-Za-z_][A-Za-z0-9_]*)\s*\{", text):
-            ranges.append((m.start(1), m.end(1)))
-        return ranges
-
 
 class LineNumberArea(QWidget):
     def __init__(self, editor: "CodeEditor"):
@@ -299,12 +645,47 @@ class LineNumberArea(QWidget):
 
 
 class CodeEditor(QPlainTextEdit):
+    # Emitted when a streamed load_text() has appended its last chunk (or
+    # was cut short), so listeners held off by the load can catch up.
+    loadFinished = pyqtSignal()
+
     def __init__(self, parent: QWidget | None = None):
         super().__init__(parent)
         self._line_number_area = LineNumberArea(self)
         self._highlighter = QGHighlighter(self.document())
         self._breakpoints: set[int] = set()
         self._debug_line: int | None = None
+        # Width of a digit in the current font, and the viewport margin last
+        # applied; the digit width and the line-number labels are reset when
+        # the font changes (setFont or zoom).
+        self._digit_px: int | None = None
+        self._static_nums: list[tuple[QStaticText, float]] = []
+        self._margin_width = -1
+        self._gutter_bg = QColor(EDITOR_BG)
+        self._gutter_text = QColor(INACTIVE_TAB_TEXT)
+        self._gutter_current = QColor(ACTIVE_TAB_TEXT)
+        self._breakpoint_color = QColor(BREAKPOINT)
+        # Text still to be appended by load_text, and how much of it is in.
+        self._load_pending = ""
+        self._load_pos = 0
+        self._load_timer = QTimer(self)
+        self._load_timer.setInterval(0)
+        self._load_timer.timeout.connect(self._load_next_chunk)
+        # Zoom steps not yet applied. Steps arriving within one timer window
+        # (e.g. autorepeat queued behind a slow relayout) are applied as a
+        # single font change.
+        self._pending_zoom = 0
+        self._zoom_timer = QTimer(self)
+        self._zoom_timer.setSingleShot(True)
+        self._zoom_timer.setInterval(16)
+        self._zoom_timer.timeout.connect(self._apply_zoom)
+        # Open-block stacks for the "!" and "?" indent lookups: entry n is the
+        # stack after block n, kept as (indent, rest) pairs so each block
+        # costs O(1). Only a prefix of the document is covered; it is built
+        # on demand and cut back to the first changed block on every edit.
+        self._opener_stacks: list[tuple | None] = []
+        self._if_stacks: list[tuple | None] = []
+        self.document().contentsChange.connect(self._invalidate_indent_stacks)
 
         QShortcut(QKeySequence("Ctrl+="), self, activated=self._zoom_in)
         QShortcut(QKeySequence("Ctrl+-"), self, activated=self._zoom_out)
@@ -312,6 +693,9 @@ class CodeEditor(QPlainTextEdit):
         self.blockCountChanged.connect(self._update_line_number_area_width)
         self.updateRequest.connect(self._update_line_number_area)
         self.cursorPositionChanged.connect(self._highlight_current_line)
+        # Cursor block, block number, read-only flag and debug line the line
+        # selections were last built for.
+        self._current_line_key: tuple | None = None
 
         font = QFont("Consolas")
         font.setStyleHint(QFont.Monospace)
@@ -324,21 +708,86 @@ class CodeEditor(QPlainTextEdit):
         self._update_line_number_area_width(0)
         self._highlight_current_line()
 
-        self.setStyleSheet(
-            f"""
-            QPlainTextEdit {{
-                background: {EDITOR_BG};
-                color: {ACTIVE_TAB_TEXT};
-                border: 1px solid {DIVIDER};
-            }}
-            """
-        )
+    def changeEvent(self, event):
+        if event.type() == QEvent.FontChange:
+            self._digit_px = None
+            self._static_nums = []
+        super().changeEvent(event)
+
+    def load_text(self, text: str) -> None:
+        # Replace the whole document with the highlighter detached, so the
+        # text goes in without highlighting every block synchronously.
+        # Reattaching schedules one rehighlight for when the event loop is idle.
+        # Long texts only start with their first chunk; the rest is appended
+        # from the event loop, read-only, so the editor paints and responds
+        # while it streams in.
+        self._stop_loading()
+        end = len(text)
+        if end > _LOAD_CHUNK_CHARS:
+            end = self._chunk_end(text, 0)
+        self._highlighter.setDocument(None)
+        self.setPlainText(text[:end])
+        self._highlighter.setDocument(self.document())
+        if end < len(text):
+            self._load_pending = text
+            self._load_pos = end
+            self.document().setUndoRedoEnabled(False)
+            self.setReadOnly(True)
+            self._load_timer.start()
+
+    def is_loading(self) -> bool:
+        return self._load_timer.isActive()
+
+    @staticmethod
+    def _chunk_end(text: str, start: int) -> int:
+        # Chunks end just after a newline, so a "\r\n" pair is never split
+        # into two line breaks across chunks.
+        end = text.find("\n", start + _LOAD_CHUNK_CHARS)
+        return len(text) if end == -1 else end + 1
+
+    def _load_next_chunk(self) -> None:
+        text = self._load_pending
+        start = self._load_pos
+        end = self._chunk_end(text, start)
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        # Keep the partial load from reaching textChanged listeners (the tab
+        # title) as an edit.
+        self.blockSignals(True)
+        cursor.insertText(text[start:end])
+        self.document().setModified(False)
+        self.blockSignals(False)
+        self._update_line_number_area_width(0)
+        self._load_pos = end
+        if end >= len(text):
+            self._stop_loading()
+
+    def _stop_loading(self) -> None:
+        if not self._load_timer.isActive():
+            return
+        self._load_timer.stop()
+        self._load_pending = ""
+        self._load_pos = 0
+        self.document().setUndoRedoEnabled(True)
+        self.setReadOnly(False)
+        self.loadFinished.emit()
+
+    def queue_zoom(self, steps: int) -> None:
+        self._pending_zoom += steps
+        if not self._zoom_timer.isActive():
+            self._zoom_timer.start()
+
+    def _apply_zoom(self) -> None:
+        steps = self._pending_zoom
+        self._pending_zoom = 0
+        if steps:
+            self.zoomIn(steps)
 
     def _zoom_in(self) -> None:
-        self.zoomIn(1)
+        self.queue_zoom(1)
 
     def _zoom_out(self) -> None:
-        self.zoomOut(1)
+        self.queue_zoom(-1)
 
     def keyPressEvent(self, event):
         key = event.key()
@@ -363,7 +812,7 @@ class CodeEditor(QPlainTextEdit):
 
         if event.text():
             ch = event.text()
-            if ch in "([{\"":
+            if ch in _AUTO_PAIRS:
                 if self._handle_auto_pair(ch):
                     return
             if ch == "<":
@@ -376,17 +825,16 @@ class CodeEditor(QPlainTextEdit):
         super().keyPressEvent(event)
 
     def _handle_auto_pair(self, opener: str) -> bool:
-        pairs = {"(": ")", "[": "]", "{": "}", '"': '"'}
-        if opener not in pairs:
+        closer = _AUTO_PAIRS.get(opener)
+        if closer is None:
             return False
 
         cursor = self.textCursor()
         if cursor.hasSelection():
             selected = cursor.selectedText()
-            cursor.insertText(f"{opener}{selected}{pairs[opener]}")
+            cursor.insertText(f"{opener}{selected}{closer}")
             return True
 
-        closer = pairs[opener]
         cursor.insertText(opener + closer)
         cursor.movePosition(cursor.Left)
         self.setTextCursor(cursor)
@@ -421,7 +869,7 @@ class CodeEditor(QPlainTextEdit):
         if cursor.positionInBlock() != 0 and block.text()[: cursor.positionInBlock()].strip():
             return False
 
-        indent = self._find_matching_opener_indent(cursor.blockNumber())
+        indent = self._find_matching_opener_indent(block)
         self._replace_line_indent(cursor, indent)
         cursor.insertText("!")
         return True
@@ -433,7 +881,7 @@ class CodeEditor(QPlainTextEdit):
         if prefix.strip() != "!":
             return False
 
-        indent = self._find_matching_if_indent(cursor.blockNumber())
+        indent = self._find_matching_if_indent(block)
         self._replace_line_indent(cursor, indent)
         cursor.insertText("?")
         return True
@@ -479,7 +927,7 @@ class CodeEditor(QPlainTextEdit):
             return False
         if text.endswith(":") or text.endswith("?"):
             return True
-        if re.match(r"^\s*While\b.*\)\s*$", text):
+        if "While" in text and _RE_WHILE_OPENER.match(text):
             return True
         if text.lstrip().startswith("!?"):
             return True
@@ -488,11 +936,10 @@ class CodeEditor(QPlainTextEdit):
     def _is_continuation(self, text: str) -> bool:
         if not text:
             return False
-        if re.search(r"(=|->|\+|-|\*|&|\||==|<=|>=|<|>)\s*$", text):
-            return True
-        if text.rstrip().endswith(("(", "{", "[", "<")):
-            return True
-        return False
+        # A trailing operator (=, ->, +, -, *, &, |, ==, <=, >=, <, >) or an
+        # open bracket; every such ending is decided by its last character.
+        stripped = text.rstrip()
+        return bool(stripped) and stripped[-1] in _CONTINUATION_END
 
     def _leading_spaces(self, text: str) -> int:
         return len(text) - len(text.lstrip(" "))
@@ -509,14 +956,58 @@ class CodeEditor(QPlainTextEdit):
         c.insertText(" " * indent)
         self.setTextCursor(c)
 
-    def _find_matching_opener_indent(self, block_number: int) -> int:
-        doc = self.document()
+    def _invalidate_indent_stacks(self, pos: int, _removed: int, _added: int) -> None:
+        if self._opener_stacks:
+            first = self.document().findBlock(pos).blockNumber()
+            del self._opener_stacks[first:]
+            del self._if_stacks[first:]
+
+    def _extend_indent_stacks(self, count: int) -> None:
+        # Cover the first `count` blocks. Closers ("!", "!?") pop, openers
+        # push their indent; a closer with nothing open is ignored. "!?" ends
+        # one if-branch and opens the next, so it only pops the if stack.
+        openers = self._opener_stacks
+        ifs = self._if_stacks
+        if len(openers) >= count:
+            return
+        opener_top = openers[-1] if openers else None
+        if_top = ifs[-1] if ifs else None
+        block = self.document().findBlockByNumber(len(openers))
+        while len(openers) < count and block.isValid():
+            line = block.text()
+            block = block.next()
+            stripped = line.strip()
+            # Only closers and openers (ending ":", "?" or a While's ")")
+            # matter; skip plain statements cheaply.
+            if stripped and (stripped[0] == "!" or stripped[-1] in ":?)"):
+                if stripped == "!":
+                    opener_top = opener_top and opener_top[1]
+                    if_top = if_top and if_top[1]
+                elif stripped.startswith("!?"):
+                    opener_top = (self._leading_spaces(line), opener_top)
+                    if_top = if_top and if_top[1]
+                else:
+                    if self._is_block_opener(stripped):
+                        opener_top = (self._leading_spaces(line), opener_top)
+                    if stripped[-1] == "?":
+                        if_top = (self._leading_spaces(line), if_top)
+            openers.append(opener_top)
+            ifs.append(if_top)
+
+    def _find_matching_opener_indent(self, block: QTextBlock) -> int:
+        # Walk back over the blocks the cached stacks do not cover yet, since
+        # the matching opener is usually close. If it is not among them,
+        # extend the cache up to `block` and read the answer off it, which
+        # keeps repeated lookups deep in a long file O(1).
+        number = block.blockNumber()
         depth = 0
-        for i in range(block_number - 1, -1, -1):
-            block = doc.findBlockByNumber(i)
+        for _ in range(number - len(self._opener_stacks)):
+            block = block.previous()
             line = block.text()
             stripped = line.strip()
-            if not stripped:
+            # Only closers ("!", "!?") and openers (ending ":", "?" or a
+            # While's ")") matter; skip plain statements cheaply.
+            if not stripped or (stripped[0] != "!" and stripped[-1] not in ":?)"):
                 continue
             if stripped == "!":
                 depth += 1
@@ -530,16 +1021,21 @@ class CodeEditor(QPlainTextEdit):
                 if depth == 0:
                     return self._leading_spaces(line)
                 depth -= 1
-        return 0
-
-    def _find_matching_if_indent(self, block_number: int) -> int:
-        doc = self.document()
+        if number <= 0:
+            return 0
+        self._extend_indent_stacks(number)
+        top = self._opener_stacks[number - 1]
+        return top[0] if top else 0
+
+    def _find_matching_if_indent(self, block: QTextBlock) -> int:
+        # Same lookup as _find_matching_opener_indent, for "?" openers.
+        number = block.blockNumber()
         depth = 0
-        for i in range(block_number - 1, -1, -1):
-            block = doc.findBlockByNumber(i)
+        for _ in range(number - len(self._if_stacks)):
+            block = block.previous()
             line = block.text()
             stripped = line.strip()
-            if not stripped:
+            if not stripped or (stripped[0] != "!" and stripped[-1] != "?"):
                 continue
             if stripped == "!":
                 depth += 1
@@ -551,26 +1047,41 @@ class CodeEditor(QPlainTextEdit):
                 if depth == 0:
                     return self._leading_spaces(line)
                 depth -= 1
-        return 0
+        if number <= 0:
+            return 0
+        self._extend_indent_stacks(number)
+        top = self._if_stacks[number - 1]
+        return top[0] if top else 0
 
     def _prev_non_space_char(self, pos: int) -> str:
+        # Last non-space character at or before document position pos. Scans
+        # the block's text in Python and only steps to earlier blocks while
+        # they are blank, instead of one characterAt() call per character.
         if pos < 0:
             return ""
-        doc = self.document()
-        while pos >= 0:
-            ch = doc.characterAt(pos)
-            if ch and not ch.isspace():
-                return ch
-            pos -= 1
-        return ""
+        block = self.document().findBlock(pos)
+        text = block.text()[: pos - block.position() + 1]
+        while True:
+            text = text.rstrip()
+            if text:
+                return text[-1]
+            block = block.previous()
+            if not block.isValid():
+                return ""
+            text = block.text()
 
     def line_number_area_width(self) -> int:
         digits = max(2, len(str(max(1, self.blockCount()))))
+        if self._digit_px is None:
+            self._digit_px = self.fontMetrics().horizontalAdvance("9")
         # padding + digit width
-        return 12 + self.fontMetrics().horizontalAdvance("9") * digits
+        return 12 + self._digit_px * digits
 
     def _update_line_number_area_width(self, _new_block_count: int) -> None:
-        self.setViewportMargins(self.line_number_area_width(), 0, 0, 0)
+        width = self.line_number_area_width()
+        if width != self._margin_width:
+            self._margin_width = width
+            self.setViewportMargins(width, 0, 0, 0)
 
     def _update_line_number_area(self, rect: QRect, dy: int) -> None:
         if dy:
@@ -587,54 +1098,84 @@ class CodeEditor(QPlainTextEdit):
 
     def paint_line_number_area(self, event) -> None:
         painter = QPainter(self._line_number_area)
-        painter.fillRect(event.rect(), QColor(EDITOR_BG))
+        rect = event.rect()
+        painter.fillRect(rect, self._gutter_bg)
 
         block = self.firstVisibleBlock()
         block_number = block.blockNumber()
         top = int(self.blockBoundingGeometry(block).translated(self.contentOffset()).top())
         bottom = top + int(self.blockBoundingRect(block).height())
 
-        line_color = QColor(INACTIVE_TAB_TEXT)
         current_line = self.textCursor().blockNumber()
-
-        while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible() and bottom >= event.rect().top():
-                number = str(block_number + 1)
-                if block_number == current_line:
-                    painter.setPen(QColor(ACTIVE_TAB_TEXT))
-                else:
-                    painter.setPen(line_color)
-
-                painter.drawText(
-                    0,
-                    top,
-                    self._line_number_area.width() - 6,
-                    self.fontMetrics().height(),
-                    Qt.AlignRight,
-                    number,
-                )
-
-                if (block_number + 1) in self._breakpoints:
+        rect_top = rect.top()
+        rect_bottom = rect.bottom()
+        text_width = self._line_number_area.width() - 6
+        line_height = self.fontMetrics().height()
+        pen_color = None
+        static_nums = self._static_nums
+        breakpoints = self._breakpoints
+        breakpoint_color = self._breakpoint_color
+        gutter_current = self._gutter_current
+        gutter_text = self._gutter_text
+        set_pen = painter.setPen
+        draw_static_text = painter.drawStaticText
+        block_height = self.blockBoundingRect
+
+        while block.isValid() and top <= rect_bottom:
+            if block.isVisible() and bottom >= rect_top:
+                # Most lines share a colour, so only switch pens on a change.
+                color = gutter_current if block_number == current_line else gutter_text
+                if color is not pen_color:
+                    set_pen(color)
+                    pen_color = color
+
+                if block_number >= len(static_nums):
+                    self._grow_static_nums(block_number + 1)
+                label, label_width = static_nums[block_number]
+                draw_static_text(QPointF(text_width - label_width, top), label)
+
+                if (block_number + 1) in breakpoints:
                     radius = 4
                     center_x = 6
-                    center_y = top + (self.fontMetrics().height() // 2)
-                    painter.setPen(QColor(BREAKPOINT))
-                    painter.setBrush(QColor(BREAKPOINT))
+                    center_y = top + (line_height // 2)
+                    set_pen(breakpoint_color)
+                    painter.setBrush(breakpoint_color)
                     painter.drawEllipse(center_x - radius, center_y - radius, radius * 2, radius * 2)
+                    pen_color = breakpoint_color
 
             block = block.next()
             block_number += 1
             top = bottom
-            bottom = top + int(self.blockBoundingRect(block).height())
+            bottom = top + int(block_height(block).height())
+
+    def _grow_static_nums(self, count: int) -> None:
+        # Line-number labels keep their glyph layout between paints; each is
+        # stored with its advance (in the gutter's own font, which zooming
+        # leaves alone) so it can be right-aligned.
+        fm = QFontMetricsF(self._line_number_area.font())
+        for n in range(len(self._static_nums) + 1, count + 1):
+            text = str(n)
+            label = QStaticText(text)
+            label.setTextFormat(Qt.PlainText)
+            self._static_nums.append((label, fm.horizontalAdvance(text)))
 
     def _highlight_current_line(self) -> None:
+        # Moves within one line (typing, autorepeat) would set the same
+        # selections again, and each set repaints the viewport. The line
+        # selection's cursor follows edits in its block, so it stays put.
+        cursor = self.textCursor()
+        key = (cursor.block(), cursor.blockNumber(), self.isReadOnly(), self._debug_line)
+        if key == self._current_line_key:
+            return
+        self._current_line_key = key
+
         extra = []
         if not self.isReadOnly():
             # In PyQt5, ExtraSelection is exposed on QTextEdit.
             selection = QTextEdit.ExtraSelection()
             selection.format.setBackground(QColor("#202020"))
             selection.format.setProperty(QTextFormat.FullWidthSelection, True)
-            selection.cursor = self.textCursor()
+            selection.cursor = cursor
             selection.cursor.clearSelection()
             extra.append(selection)
 
@@ -653,6 +1194,7 @@ class CodeEditor(QPlainTextEdit):
 
     def set_debug_line(self, line_number: int | None) -> None:
         self._debug_line = line_number
+        self._current_line_key = None
         self._highlight_current_line()
 
     def line_number_area_mouse_press(self, event) -> None:
@@ -664,6 +1206,7 @@ class CodeEditor(QPlainTextEdit):
         top = int(self.blockBoundingGeometry(block).translated(self.contentOffset()).top())
         bottom = top + int(self.blockBoundingRect(block).height())
         target_y = event.pos().y()
+        block_height = self.blockBoundingRect
 
         while block.isValid() and top <= target_y:
             if block.isVisible() and bottom >= target_y:
@@ -672,7 +1215,7 @@ class CodeEditor(QPlainTextEdit):
             block = block.next()
             block_number += 1
             top = bottom
-            bottom = top + int(self.blockBoundingRect(block).height())
+            bottom = top + int(block_height(block).height())
 
     def toggle_breakpoint(self, line_number: int) -> None:
         if line_number in self._breakpoints:
@@ -685,11 +1228,151 @@ class CodeEditor(QPlainTextEdit):
         return set(self._breakpoints)
 
 
-@dataclass
+@dataclass(slots=True)
 class CodeTab:
     editor: CodeEditor
     path: Path | None = None
 
+
+# Recently loaded scripts kept decoded, keyed by (path, mtime_ns, size) so
+# a file changed on disk is read again.
+_SCRIPT_CACHE_SIZE = 8
+
+_ScriptCacheKey = tuple[str, int, int]
+# What a path held when it was last loaded or saved here: hash(text),
+# st_mtime_ns, st_size. A save of the same text over an untouched file is
+# skipped.
+_SavedState = tuple[int, int, int]
+
+
+def _read_script(path: Path, cache: dict[_ScriptCacheKey, str]) -> tuple[_ScriptCacheKey, str]:
+    # Scripts are small, so one read() is as fast as a memory map and,
+    # unlike one, safe if another program truncates the file mid-decode.
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        key = (os.fspath(path), st.st_mtime_ns, st.st_size)
+        text = cache.get(key)
+        if text is not None:
+            return key, text
+        data = f.read()
+    try:
+        text = str(data, "utf-8")
+    except UnicodeDecodeError:
+        text = str(data, "latin-1")
+    # Universal newlines, as text-mode reads give: the editor, the reload
+    # check and the save hash all compare against "\n"-only text.
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return key, text
+
+
+def _write_script(path: Path, text: str, sync: bool = True) -> None:
+    # Write beside the target and swap it in with os.replace, so a crash or
+    # full disk never leaves a half-written script. The target's mode is
+    # kept, and a symlinked target is written through. One lstat() covers
+    # the common case; only a symlink pays for resolve() and a second stat.
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        st = None
+    if st is not None and stat.S_ISLNK(st.st_mode):
+        path = path.resolve()
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            st = None
+    tmp_path = path.with_name(f"{path.name}.tmp.{os.getpid()}.{time.time_ns()}")
+    try:
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            handle.write(text)
+            if sync:
+                handle.flush()
+                try:
+                    os.fsync(handle.fileno())
+                except OSError:
+                    pass
+        if st is not None:
+            try:
+                os.chmod(tmp_path, stat.S_IMODE(st.st_mode))
+            except OSError:
+                pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+class _ScriptWriteSignals(QObject):
+    written = pyqtSignal(object)
+    failed = pyqtSignal(object, str)
+
+
+class _ScriptWriteTask(QRunnable):
+    # Saves a script on a pool thread; see CodeEditorWidget._dispatch_writes.
+    def __init__(self, path: Path, text: str, sync: bool, saved: _SavedState | None):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.path = path
+        self.text = text
+        self.sync = sync
+        self.saved = saved
+        self.signals = _ScriptWriteSignals()
+
+    def run(self) -> None:
+        digest = hash(self.text)
+        if self.saved is not None and self.saved[0] == digest:
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                st = None
+            if st is not None and (st.st_mtime_ns, st.st_size) == self.saved[1:]:
+                self.signals.written.emit(self)
+                return
+        try:
+            _write_script(self.path, self.text, sync=self.sync)
+        except OSError as exc:
+            # The error names the temporary file, so report the target.
+            self.signals.failed.emit(self, f"Could not save {self.path}: {exc.strerror or exc}")
+            return
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self.saved = None
+        else:
+            self.saved = (digest, st.st_mtime_ns, st.st_size)
+        self.signals.written.emit(self)
+
+
+class _ScriptReadSignals(QObject):
+    loaded = pyqtSignal(object, str)
+    failed = pyqtSignal(object, str)
+
+
+class _ScriptReadTask(QRunnable):
+    # Reads and decodes a script on a pool thread so slow disks do not
+    # stall the editor; the result is queued back to the GUI thread. The
+    # task gets its own copy of the content cache, so the cache itself is
+    # only ever touched on the GUI thread.
+    def __init__(self, tab: CodeTab, path: Path, cache: dict[_ScriptCacheKey, str]):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.tab = tab
+        self.path = path
+        self.cache = cache
+        self.cache_key: _ScriptCacheKey | None = None
+        self.text_hash = 0
+        self.signals = _ScriptReadSignals()
+
+    def run(self) -> None:
+        try:
+            self.cache_key, text = _read_script(self.path, self.cache)
+            self.text_hash = hash(text)
+        except (OSError, ValueError) as exc:
+            self.signals.failed.emit(self, str(exc))
+            return
+        self.signals.loaded.emit(self, text)
+
+
 class CodeEditorWidget(QWidget):
     def __init__(self, parent: QWidget | None = None):
         super().__init__(parent)
@@ -708,6 +1391,41 @@ class CodeEditorWidget(QWidget):
         self._debug_steps_per_tick = 200
         self._debug_timer = QTimer(self)
         self._debug_timer.timeout.connect(self._debug_tick)
+        # Latest frame reported by the running program, shown when the
+        # preview timer fires.
+        self._pending_preview_frame = None
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(_PREVIEW_INTERVAL_MS)
+        self._preview_timer.timeout.connect(self._flush_preview)
+        # Interpreter classes, imported once the event loop is idle so the
+        # first Run does not pay for module initialisation.
+        self._Interpreter = None
+        self._RuntimeErrorWithLine = None
+        # Skip fsync when saving; faster on slow disks, at the cost of
+        # durability if the machine goes down right after a save.
+        self.fast_save = False
+        # Saves waiting to be written, latest text per path, and the write in
+        # flight for each path. Repeated saves of a path collapse into one
+        # pending entry, and a path is only written by one task at a time so
+        # replacements land in order. Both are only touched on the GUI thread.
+        self._pending_writes: dict[Path, str] = {}
+        self._write_tasks: dict[Path, _ScriptWriteTask] = {}
+        self._write_timer = QTimer(self)
+        self._write_timer.setSingleShot(True)
+        self._write_timer.setInterval(0)
+        self._write_timer.timeout.connect(self._dispatch_writes)
+        QApplication.instance().aboutToQuit.connect(self._flush_writes)
+        # Script reads in flight (kept alive until their result arrives), and
+        # the latest one for each editor, which is the only one applied.
+        self._read_tasks: set[_ScriptReadTask] = set()
+        self._pending_reads: dict[CodeEditor, _ScriptReadTask] = {}
+        self._script_cache: OrderedDict[_ScriptCacheKey, str] = OrderedDict()
+        self._saved_states: dict[str, _SavedState] = {}
+        # Load/save dialogs, built on first use and then reused so their
+        # file-system model (and its directory cache) is not rebuilt per call.
+        self._open_dialog: QFileDialog | None = None
+        self._save_dialog: QFileDialog | None = None
 
         root = QVBoxLayout(self)
         root.setContentsMargins(0, 0, 0, 0)
@@ -846,137 +1564,10 @@ class CodeEditorWidget(QWidget):
 
         self._apply_styles()
         self._new_tab()
+        QTimer.singleShot(0, self._prefetch_interpreter)
 
     def _apply_styles(self) -> None:
-        self.setStyleSheet(
-            f"""
-            QWidget {{
-                background: {APP_BG};
-                color: {ACTIVE_TAB_TEXT};
-                font-family: Segoe UI, Arial;
-                font-size: 11px;
-            }}
-
-            /* Tabs (top bar) */
-            QTabWidget::pane {{
-                border: none;
-            }}
-            QTabBar {{
-                background: {TOP_BAR_BG};
-            }}
-            QTabBar::tab {{
-                background: {TOP_BAR_BG};
-                color: {INACTIVE_TAB_TEXT};
-                padding: 8px 12px;
-                margin-right: 2px;
-                border: 1px solid {DIVIDER};
-                border-bottom: none;
-            }}
-            QTabBar::tab:selected {{
-                background: {ACTIVE_TAB_BG};
-                color: {ACTIVE_TAB_TEXT};
-            }}
-            QTabBar::close-button {{
-                image: none;
-            }}
-            QTabWidget QToolButton {{
-                background: {TOP_BAR_BG};
-                color: {ACTIVE_TAB_TEXT};
-                border: 1px solid {DIVIDER};
-                padding: 4px 10px;
-            }}
-            QTabWidget QToolButton:hover {{
-                background: {ACTIVE_TAB_BG};
-            }}
-
-            /* Toolbar */
-            #codeToolbar {{
-                background: {TOP_BAR_BG};
-                border-bottom: 1px solid {DIVIDER};
-            }}
-            #runButton {{
-                background: {RUN_BG};
-                color: {RUN_TEXT};
-                border: 1px solid {DIVIDER};
-                padding: 6px 10px;
-            }}
-            #runButton:hover {{
-                background: {RUN_HOVER};
-            }}
-            #debugButton {{
-                background: {DEBUG_BG};
-                color: {DEBUG_TEXT};
-                border: 1px solid {DIVIDER};
-                padding: 6px 10px;
-            }}
-            #debugButton:hover {{
-                background: {DEBUG_HOVER};
-            }}
-            #stepButton, #continueButton {{
-                background: {SAVE_BG};
-                color: {SAVE_TEXT};
-                border: 1px solid {DIVIDER};
-                padding: 6px 10px;
-            }}
-            #stepButton:hover, #continueButton:hover {{
-                background: {SAVE_HOVER};
-            }}
-            #liveButton {{
-                background: {LIVE_BG};
-                color: {LIVE_TEXT};
-                border: 1px solid {DIVIDER};
-                padding: 6px 10px;
-            }}
-            #liveButton:hover {{
-                background: {LIVE_HOVER};
-            }}
-            #saveButton {{
-                background: {SAVE_BG};
-                color: {SAVE_TEXT};
-                border: 1px solid {DIVIDER};
-                padding: 6px 12px;
-            }}
-            #saveButton:hover {{
-                background: {SAVE_HOVER};
-            }}
-            #loadButton {{
-                background: {LOAD_BG};
-                color: {LOAD_TEXT};
-                border: 1px solid {DIVIDER};
-                padding: 6px 12px;
-            }}
-            #loadButton:hover {{
-                background: {LOAD_HOVER};
-            }}
-            #liveSpeed {{
-                background: {TOP_BAR_BG};
-            }}
-            #liveSpeedLabel {{
-                color: {INACTIVE_TAB_TEXT};
-                padding-left: 4px;
-            }}
-
-            /* Splitter divider */
-            QSplitter::handle {{
-                background: {DIVIDER};
-            }}
-
-            /* API panel */
-            #apiPanel {{
-                background: {SIDEBAR_BG};
-                border-left: 1px solid {DIVIDER};
-                min-width: 280px;
-            }}
-            #apiTitle {{
-                font-size: 13px;
-                font-weight: 600;
-                color: {ACTIVE_TAB_TEXT};
-            }}
-            #apiBody {{
-                color: {INACTIVE_TAB_TEXT};
-            }}
-            """
-        )
+        self.setStyleSheet(_APP_STYLESHEET)
 
     def _tab_label_for(self, path: Path | None, index: int) -> str:
         if path is not None:
@@ -987,6 +1578,7 @@ class CodeEditorWidget(QWidget):
         editor = CodeEditor()
         editor.textChanged.connect(self._update_current_tab_title)
         tab = CodeTab(editor=editor, path=None)
+        editor.loadFinished.connect(lambda: self._on_load_finished(tab))
         self._tabs.append(tab)
 
         idx = len(self._tabs)
@@ -1013,6 +1605,7 @@ class CodeEditorWidget(QWidget):
             if choice != QMessageBox.Yes:
                 return
 
+        self._pending_reads.pop(editor, None)
         self.tab_widget.removeTab(index)
         try:
             self._tabs.pop(index)
@@ -1021,6 +1614,20 @@ class CodeEditorWidget(QWidget):
 
     def _on_tab_changed(self, _index: int) -> None:
         self._update_current_tab_title()
+        self._update_run_buttons()
+
+    def _on_load_finished(self, tab: CodeTab) -> None:
+        self._update_tab_title(tab)
+        self._update_run_buttons()
+
+    def _update_run_buttons(self) -> None:
+        # A tab still streaming in its script holds only part of the
+        # program, so it cannot be run until the load finishes.
+        tab = self._active_tab()
+        enabled = tab is None or not tab.editor.is_loading()
+        self.run_btn.setEnabled(enabled)
+        self.debug_btn.setEnabled(enabled)
+        self.live_btn.setEnabled(enabled)
 
     def _active_tab(self) -> CodeTab | None:
         idx = self.tab_widget.currentIndex()
@@ -1028,10 +1635,20 @@ class CodeEditorWidget(QWidget):
             return None
         return self._tabs[idx]
 
+    def _tab_index(self, tab: CodeTab) -> int:
+        for idx, other in enumerate(self._tabs):
+            if other is tab:
+                return idx
+        return -1
+
     def _update_current_tab_title(self) -> None:
-        idx = self.tab_widget.currentIndex()
         tab = self._active_tab()
-        if tab is None or idx < 0:
+        if tab is not None:
+            self._update_tab_title(tab)
+
+    def _update_tab_title(self, tab: CodeTab) -> None:
+        idx = self._tab_index(tab)
+        if idx < 0:
             return
         label = self._tab_label_for(tab.path, idx + 1)
         editor = tab.editor
@@ -1050,20 +1667,27 @@ class CodeEditorWidget(QWidget):
         self._preview_update = update_handler
         self._preview_close = close_handler
 
+    def _prefetch_interpreter(self) -> None:
+        if self._Interpreter is not None:
+            return
+        from Interpreter.interpreter import Interpreter, RuntimeErrorWithLine
+
+        self._Interpreter = Interpreter
+        self._RuntimeErrorWithLine = RuntimeErrorWithLine
+
     def _run_program(self) -> None:
         tab = self._active_tab()
-        if tab is None:
+        if tab is None or tab.editor.is_loading():
             return
         source = tab.editor.toPlainText()
+        self._prefetch_interpreter()
         try:
-            from Interpreter.interpreter import Interpreter, RuntimeErrorWithLine
-
-            interp = Interpreter(
+            interp = self._Interpreter(
                 publish_handler=self._publish_handler,
                 send_handler=self._send_handler,
             )
             interp.run_source(source)
-        except RuntimeErrorWithLine as exc:
+        except self._RuntimeErrorWithLine as exc:
             QMessageBox.critical(self, "Runtime Error", str(exc))
         except Exception as exc:
             QMessageBox.critical(self, "Run Failed", str(exc))
@@ -1111,13 +1735,17 @@ class CodeEditorWidget(QWidget):
     def _debug_continue_tick(self) -> None:
         if not self._prime_debug_iter():
             return
+        # Only the line reached at the end of the tick is ever painted, so
+        # the editor is told about it once rather than after every step.
         for _ in range(self._debug_steps_per_tick):
             if self._debug_current is not None and self._debug_current.line in self._debug_breakpoints:
                 self._debug_timer.stop()
+                self._show_debug_line()
                 self._show_debug_controls(True)
                 return
-            if not self._debug_advance():
+            if not self._debug_advance(show_line=False):
                 return
+        self._show_debug_line()
 
     def _debug_live_tick(self) -> None:
         if not self._prime_debug_iter():
@@ -1128,7 +1756,7 @@ class CodeEditorWidget(QWidget):
     def _prepare_debug_session(self, preview_title: str) -> bool:
         self._stop_debug_session()
         tab = self._active_tab()
-        if tab is None:
+        if tab is None or tab.editor.is_loading():
             return False
 
         source = tab.editor.toPlainText()
@@ -1137,10 +1765,9 @@ class CodeEditorWidget(QWidget):
         if self._preview_create is not None:
             self._preview_tab_index = self._preview_create(preview_title)
 
+        self._prefetch_interpreter()
         try:
-            from Interpreter.interpreter import Interpreter
-
-            interp = Interpreter(
+            interp = self._Interpreter(
                 publish_handler=self._publish_handler,
                 send_handler=self._send_handler,
             )
@@ -1155,6 +1782,7 @@ class CodeEditorWidget(QWidget):
     def _stop_debug_session(self) -> None:
         if self._debug_timer.isActive():
             self._debug_timer.stop()
+        self._flush_preview()
         self._debug_iter = None
         self._debug_current = None
         self._debug_mode = None
@@ -1170,33 +1798,46 @@ class CodeEditorWidget(QWidget):
             return True
         return self._debug_advance()
 
-    def _debug_advance(self) -> bool:
+    def _debug_advance(self, show_line: bool = True) -> bool:
         if self._debug_iter is None:
             return False
         try:
             self._debug_current = next(self._debug_iter)
-            tab = self._active_tab()
-            if tab:
-                tab.editor.set_debug_line(self._debug_current.line)
+            if show_line:
+                self._show_debug_line()
             return True
         except StopIteration:
             self._stop_debug_session()
             return False
         except Exception as exc:
-            from Interpreter.interpreter import RuntimeErrorWithLine
-
-            if isinstance(exc, RuntimeErrorWithLine):
+            if isinstance(exc, self._RuntimeErrorWithLine):
                 QMessageBox.critical(self, "Runtime Error", str(exc))
             else:
                 QMessageBox.critical(self, "Run Failed", str(exc))
             self._stop_debug_session()
             return False
 
+    def _show_debug_line(self) -> None:
+        tab = self._active_tab()
+        if tab and self._debug_current is not None:
+            tab.editor.set_debug_line(self._debug_current.line)
+
     def _on_statement_end(self, frame) -> None:
         if self._preview_update is None:
             return
         if self._preview_tab_index is None:
             return
+        # Coalesce: only the newest frame per preview interval is drawn.
+        self._pending_preview_frame = frame
+        if not self._preview_timer.isActive():
+            self._preview_timer.start()
+
+    def _flush_preview(self) -> None:
+        self._preview_timer.stop()
+        frame = self._pending_preview_frame
+        self._pending_preview_frame = None
+        if frame is None or self._preview_update is None or self._preview_tab_index is None:
+            return
         self._preview_update(self._preview_tab_index, frame)
 
     def _show_debug_controls(self, show: bool) -> None:
@@ -1220,59 +1861,148 @@ class CodeEditorWidget(QWidget):
     def _zoom_active_in(self) -> None:
         tab = self._active_tab()
         if tab:
-            tab.editor.zoomIn(1)
+            tab.editor.queue_zoom(1)
 
     def _zoom_active_out(self) -> None:
         tab = self._active_tab()
         if tab:
-            tab.editor.zoomOut(1)
+            tab.editor.queue_zoom(-1)
 
     def load(self) -> None:
         tab = self._active_tab()
         if tab is None:
             return
 
-        file_name, _filter = QFileDialog.getOpenFileName(
-            self,
-            "Load Script",
-            "",
-            "QGraphic script (*.qgk *.txt);;All files (*.*)",
-        )
-        if not file_name:
+        dialog = self._open_dialog
+        if dialog is None:
+            dialog = self._open_dialog = QFileDialog(self, "Load Script")
+            dialog.setOptions(_FILE_DIALOG_OPTIONS)
+            dialog.setFileMode(QFileDialog.ExistingFile)
+            dialog.setNameFilter("QGraphic script (*.qgk *.txt);;All files (*.*)")
+        files = dialog.selectedFiles() if dialog.exec_() else []
+        if not files:
             return
+        file_name = files[0]
 
         path = Path(file_name)
-        try:
-            text = path.read_text(encoding="utf-8")
-        except UnicodeDecodeError:
-            text = path.read_text(encoding="latin-1")
+        task = _ScriptReadTask(tab, path, dict(self._script_cache))
+        task.signals.loaded.connect(self._on_script_loaded)
+        task.signals.failed.connect(self._on_script_failed)
+        # A newer load into the same tab supersedes this one.
+        self._read_tasks.add(task)
+        self._pending_reads[tab.editor] = task
+        tab.editor.setReadOnly(True)
+        self.tab_widget.setTabText(self._tab_index(tab), f"Loading {path.name}...")
+        QThreadPool.globalInstance().start(task)
+
+    def _finish_read(self, task: _ScriptReadTask) -> bool:
+        self._read_tasks.discard(task)
+        editor = task.tab.editor
+        if self._pending_reads.get(editor) is not task:
+            return False
+        del self._pending_reads[editor]
+        editor.setReadOnly(False)
+        return True
 
-        tab.editor.blockSignals(True)
-        tab.editor.setPlainText(text)
-        tab.editor.document().setModified(False)
-        tab.editor.blockSignals(False)
+    def _on_script_loaded(self, task: _ScriptReadTask, text: str) -> None:
+        cache = self._script_cache
+        cache[task.cache_key] = text
+        cache.move_to_end(task.cache_key)
+        if len(cache) > _SCRIPT_CACHE_SIZE:
+            cache.popitem(last=False)
+        name, mtime_ns, size = task.cache_key
+        self._saved_states[name] = (task.text_hash, mtime_ns, size)
+        if not self._finish_read(task):
+            return
+        tab = task.tab
+        # Reloading the file a tab already shows, unchanged, keeps the
+        # document as is (and with it the cursor, scroll and highlighting).
+        if tab.path == task.path and not tab.editor.is_loading() and tab.editor.toPlainText() == text:
+            tab.editor.document().setModified(False)
+        else:
+            tab.editor.blockSignals(True)
+            tab.editor.load_text(text)
+            tab.editor.document().setModified(False)
+            tab.editor.blockSignals(False)
 
-        tab.path = path
-        self._update_current_tab_title()
+        tab.path = task.path
+        self._update_tab_title(tab)
+        self._update_run_buttons()
+
+    def _on_script_failed(self, task: _ScriptReadTask, message: str) -> None:
+        if not self._finish_read(task):
+            return
+        self._update_tab_title(task.tab)
+        QMessageBox.critical(self, "Load Failed", message)
 
     def save(self) -> None:
         tab = self._active_tab()
         if tab is None:
             return
 
+        if tab.editor.is_loading():
+            return
+
         path = tab.path
         if path is None:
-            file_name, _filter = QFileDialog.getSaveFileName(
-                self,
-                "Save Script",
-                "script1.qgk",
-                "QGraphic script (*.qgk);;Text (*.txt);;All files (*.*)",
-            )
-            if not file_name:
+            dialog = self._save_dialog
+            if dialog is None:
+                dialog = self._save_dialog = QFileDialog(self, "Save Script")
+                dialog.setOptions(_FILE_DIALOG_OPTIONS)
+                dialog.setAcceptMode(QFileDialog.AcceptSave)
+                dialog.setNameFilter("QGraphic script (*.qgk);;Text (*.txt);;All files (*.*)")
+            dialog.selectFile("script1.qgk")
+            files = dialog.selectedFiles() if dialog.exec_() else []
+            if not files:
                 return
+            file_name = files[0]
             path = Path(file_name)
             tab.path = path
 
-        path.write_text(tab.editor.toPlainText(), encoding="utf-8")
+        self._pending_writes[path] = tab.editor.toPlainText()
+        # mtime granularity can hide a same-size rewrite; drop cached copies.
+        name = os.fspath(path)
+        for key in [key for key in self._script_cache if key[0] == name]:
+            del self._script_cache[key]
         tab.editor.document().setModified(False)
         self._update_current_tab_title()
+        self._write_timer.start()
+
+    def _dispatch_writes(self) -> None:
+        for path in list(self._pending_writes):
+            if path in self._write_tasks:
+                continue
+            saved = self._saved_states.get(os.fspath(path))
+            task = _ScriptWriteTask(path, self._pending_writes.pop(path), not self.fast_save, saved)
+            task.signals.written.connect(self._on_script_written)
+            task.signals.failed.connect(self._on_script_write_failed)
+            self._write_tasks[path] = task
+            QThreadPool.globalInstance().start(task)
+
+    def _on_script_written(self, task: _ScriptWriteTask) -> None:
+        del self._write_tasks[task.path]
+        if task.saved is not None:
+            self._saved_states[os.fspath(task.path)] = task.saved
+        else:
+            self._saved_states.pop(os.fspath(task.path), None)
+        if task.path in self._pending_writes:
+            self._write_timer.start()
+
+    def _on_script_write_failed(self, task: _ScriptWriteTask, message: str) -> None:
+        task.saved = None
+        self._on_script_written(task)
+        for tab in self._tabs:
+            if tab.path == task.path:
+                tab.editor.document().setModified(True)
+                self._update_tab_title(tab)
+        QMessageBox.critical(self, "Save Failed", message)
+
+    def _flush_writes(self) -> None:
+        # On quit, let writes in flight finish and write what is still queued
+        # here, since no further event-loop passes will dispatch it.
+        self._write_timer.stop()
+        QThreadPool.globalInstance().waitForDone()
+        pending = self._pending_writes
+        self._pending_writes = {}
+        for path, text in pending.items():
+            _write_script(path, text, sync=not self.fast_save)
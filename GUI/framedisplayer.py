@@ -1,9 +1,10 @@
 import sys
 import os
-import json
-import zlib
 import copy
+import math
 from datetime import datetime
+
+import numpy as np
 from PyQt5.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -16,7 +17,7 @@ from PyQt5.QtWidgets import (
     QColorDialog,
     QGraphicsView,
     QGraphicsScene,
-    QGraphicsEllipseItem,
+    QGraphicsItem,
     QPushButton,
     QButtonGroup,
     QCheckBox,
@@ -31,20 +32,39 @@ from PyQt5.QtWidgets import (
     QShortcut,
 )
 from PyQt5.QtGui import QKeySequence
-from PyQt5.QtGui import QColor, QBrush, QPen, QPainter, QPainterPath
+from PyQt5.QtGui import QColor, QBrush, QImage, QPen, QPainter, QPainterPath
 from PyQt5.QtCore import Qt, QRectF, QTimer, QFileInfo
 from PyQt5.QtWidgets import QSpinBox, QDoubleSpinBox, QComboBox, QRadioButton
 
 # Ensure parent directory is in sys.path for import
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from Engine.engine import Frame
+from Engine.engine import Frame, decode_qgc, encode_qgc, frame_to_rgb565_bytes
 
 
-def rgb565_to_qcolor(r5: int, g6: int, b5: int) -> QColor:
+def _build_rgb565_lut() -> np.ndarray:
+    # Opaque 0xAARRGGBB for every packed RGB565 value.
+    px = np.arange(1 << 16, dtype=np.uint32)
+    r5 = px >> 11
+    g6 = (px >> 5) & 0x3F
+    b5 = px & 0x1F
     r = (r5 << 3) | (r5 >> 2)
     g = (g6 << 2) | (g6 >> 4)
     b = (b5 << 3) | (b5 >> 2)
-    return QColor(r, g, b)
+    return 0xFF000000 | (r << 16) | (g << 8) | b
+
+
+_RGB565_TO_ARGB32 = _build_rgb565_lut()
+
+
+def rgb565_to_qcolor(r5: int, g6: int, b5: int) -> QColor:
+    return QColor.fromRgba(int(_RGB565_TO_ARGB32[(r5 << 11) | (g6 << 5) | b5]))
+
+
+def frame_to_argb32(frame: Frame) -> np.ndarray:
+    # The frame's pixels as opaque 0xAARRGGBB values, shape (32, 64); the
+    # vectorized counterpart of rgb565_to_qcolor.
+    px = np.frombuffer(frame_to_rgb565_bytes(frame), dtype="<u2").reshape(32, 64)
+    return _RGB565_TO_ARGB32[px]
 
 
 def qcolor_to_rgb565(color: QColor) -> tuple[int, int, int]:
@@ -54,39 +74,190 @@ def qcolor_to_rgb565(color: QColor) -> tuple[int, int, int]:
     return r5, g6, b5
 
 
-QGC_MAGIC = b"QGC1"
-
-
 def serialize_frame(frame: Frame) -> bytes:
-    payload = {
-        "w": 64,
-        "h": 32,
-        "pixels": frame.display,
-    }
-    raw = json.dumps(payload).encode("utf-8")
-    compressed = zlib.compress(raw, level=6)
-    return QGC_MAGIC + compressed
+    return encode_qgc(frame)
 
 
 def deserialize_frame(data: bytes) -> list[list[tuple[int, int, int]]]:
-    if not data.startswith(QGC_MAGIC):
-        raise ValueError("Invalid .qgc file")
-    raw = zlib.decompress(data[len(QGC_MAGIC):])
-    payload = json.loads(raw.decode("utf-8"))
-    if payload.get("w") != 64 or payload.get("h") != 32:
-        raise ValueError("Unsupported frame size")
-    return payload["pixels"]
-
-
-class PixelItem(QGraphicsEllipseItem):
-    def __init__(self, x: int, y: int, rect: QRectF, parent=None):
-        super().__init__(rect, parent)
-        self.x = x
-        self.y = y
-        self.default_pen = QPen(QColor(30, 30, 30), 1)
-        self.selected_pen = QPen(QColor(255, 255, 255), 2)
-        self.setPen(self.default_pen)
-        self.setBrush(QBrush(QColor(0, 0, 0)))
+    return decode_qgc(data).display
+
+
+LED_PEN = QPen(QColor(30, 30, 30), 1)
+LED_SELECTED_PEN = QPen(QColor(255, 255, 255), 2)
+
+# Above this many device pixels per scene unit the LEDs are drawn straight
+# into the view; the cached image would be large and few cells are visible.
+_LED_CACHE_MAX_LOD = 2.0
+
+# A change to more cells than this re-renders the whole LED cache at the
+# next paint instead of redrawing the cells one by one.
+_LED_CACHE_REDRAW_CELLS = 512
+
+
+class LedGridItem(QGraphicsItem):
+    # All 64x32 LEDs of a LedMatrixScene as a single item. Repaints blit an
+    # image of the grid rendered at the view's level of detail; cells that
+    # change are redrawn into that image, so the scene never walks 2048
+    # items.
+    def __init__(self, scene: "LedMatrixScene"):
+        super().__init__()
+        self._led_scene = scene
+        # The selected pen reaches 1 unit outside a cell.
+        self._rect = scene.sceneRect().adjusted(-1, -1, 1, 1)
+        self._cache: QImage | None = None
+        self._cache_lod = 0.0
+        # One LED at the cache's level of detail: the disc's coverage mask
+        # and the outline for each selection state. See _blit_cells.
+        self._led_mask: QImage | None = None
+        self._led_rings: dict[bool, QImage] = {}
+        # Cells changed since the cache was last brought up to date. They
+        # are redrawn into it on the next paint, so a burst of edits within
+        # one event-loop turn costs one cache update and one repaint.
+        self._stale_cells: set[tuple[int, int]] = set()
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+
+    def boundingRect(self) -> QRectF:
+        return self._rect
+
+    def paint(self, painter, option, widget=None):
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        if widget is not None:
+            lod *= widget.devicePixelRatioF()
+        if lod > _LED_CACHE_MAX_LOD:
+            self._cache = None
+            self._stale_cells.clear()
+            self._draw_cells(painter, self._led_scene._cells_in(option.exposedRect))
+            return
+        if self._cache is None or lod != self._cache_lod:
+            self._render_cache(lod)
+        elif self._stale_cells:
+            self._redraw_stale_cells()
+        # The image covers exactly lod device pixels per unit, so this draws
+        # it 1:1.
+        size = self._cache.size()
+        painter.drawImage(QRectF(self._rect.x(), self._rect.y(), size.width() / lod, size.height() / lod), self._cache)
+
+    def update_cells(self, cells) -> None:
+        # Schedule a redraw of the given (x, y) cells after a colour or
+        # selection change.
+        if not cells:
+            return
+        if self._cache is None:
+            self.update()
+            return
+        self._stale_cells.update(cells)
+        if len(self._stale_cells) > _LED_CACHE_REDRAW_CELLS:
+            self._cache = None
+            self._stale_cells.clear()
+            self.update()
+            return
+        scene = self._led_scene
+        x1 = min(x for x, _ in cells)
+        y1 = min(y for _, y in cells)
+        x2 = max(x for x, _ in cells)
+        y2 = max(y for _, y in cells)
+        self.update(scene._cell_rect(x1, y1).united(scene._cell_rect(x2, y2)).adjusted(-2, -2, 2, 2))
+
+    def _redraw_stale_cells(self) -> None:
+        cells = self._stale_cells
+        self._stale_cells = set()
+        painter = QPainter(self._cache)
+        self._blit_cells(painter, cells)
+        painter.end()
+
+    def _render_cache(self, lod: float) -> None:
+        width = int(self._rect.width() * lod) + 1
+        height = int(self._rect.height() * lod) + 1
+        self._cache = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+        self._cache.fill(Qt.transparent)
+        self._cache_lod = lod
+        self._stale_cells.clear()
+        self._render_sprites()
+        painter = QPainter(self._cache)
+        self._blit_cells(painter, self._led_scene._cells_in(self._rect))
+        painter.end()
+
+    def _render_sprites(self) -> None:
+        scene = self._led_scene
+        lod = self._cache_lod
+        pad = scene.margin / 2
+        # Large enough for any cell's tile, whichever way its edges round.
+        size = math.ceil((scene.cell_size + scene.margin) * lod) + 1
+        rect = QRectF(pad, pad, scene.cell_size, scene.cell_size)
+
+        def render(pen, brush) -> QImage:
+            image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+            image.fill(Qt.transparent)
+            painter = QPainter(image)
+            painter.setRenderHint(QPainter.Antialiasing, True)
+            painter.scale(lod, lod)
+            painter.setPen(pen)
+            painter.setBrush(brush)
+            painter.drawEllipse(rect)
+            painter.end()
+            return image
+
+        self._led_mask = render(Qt.NoPen, Qt.white)
+        self._led_rings = {False: render(LED_PEN, Qt.NoBrush), True: render(LED_SELECTED_PEN, Qt.NoBrush)}
+
+    def _blit_cells(self, painter: QPainter, cells) -> None:
+        # Draw cells into the cache from the sprites instead of rasterizing
+        # an antialiased ellipse each. A cell owns the tile of device pixels
+        # between the rounded edges of its pitch-sized box, so tiles never
+        # overlap: the tile is filled with the LED colour, cut to the disc
+        # by the mask and then outlined.
+        scene = self._led_scene
+        colors = scene._led_colors
+        preview = scene._move_preview_colors
+        selection = scene._selection
+        lod = self._cache_lod
+        step = (scene.cell_size + scene.margin) * lod
+        pad = scene.margin / 2
+        origin_x = -(pad + self._rect.x()) * lod
+        origin_y = -(pad + self._rect.y()) * lod
+        mask = self._led_mask
+        rings = self._led_rings
+        source = QPainter.CompositionMode_Source
+        destination_in = QPainter.CompositionMode_DestinationIn
+        source_over = QPainter.CompositionMode_SourceOver
+        set_mode = painter.setCompositionMode
+        fill_rect = painter.fillRect
+        draw_image = painter.drawImage
+        for x, y in cells:
+            left = round(origin_x + x * step)
+            top = round(origin_y + y * step)
+            width = round(origin_x + (x + 1) * step) - left
+            height = round(origin_y + (y + 1) * step) - top
+            color = preview.get((x, y)) if preview else None
+            set_mode(source)
+            fill_rect(left, top, width, height, color if color is not None else QColor(colors[y][x]))
+            set_mode(destination_in)
+            draw_image(left, top, mask, 0, 0, width, height)
+            set_mode(source_over)
+            draw_image(left, top, rings[(x, y) in selection])
+
+    def _draw_cells(self, painter: QPainter, cells) -> None:
+        scene = self._led_scene
+        colors = scene._led_colors
+        preview = scene._move_preview_colors
+        selection = scene._selection
+        pen = None
+        # Only switch brushes when the colour changes; runs of one colour
+        # (a cleared or filled frame) share a brush.
+        brush_key = None
+        for x, y in cells:
+            cell_pen = LED_SELECTED_PEN if (x, y) in selection else LED_PEN
+            if cell_pen is not pen:
+                painter.setPen(cell_pen)
+                pen = cell_pen
+            color = preview.get((x, y)) if preview else None
+            if color is not None:
+                painter.setBrush(color)
+                brush_key = None
+            elif colors[y][x] != brush_key:
+                brush_key = colors[y][x]
+                painter.setBrush(QColor(brush_key))
+            painter.drawEllipse(scene._cell_rect(x, y))
 
 
 class LedMatrixScene(QGraphicsScene):
@@ -118,10 +289,15 @@ class LedMatrixScene(QGraphicsScene):
         self._move_active = False
         self._move_start = None
         self._move_colors: dict[tuple[int, int], tuple[int, int, int]] = {}
-        self._move_preview: set[tuple[int, int]] = set()
+        self._move_preview_colors: dict[tuple[int, int], QColor] = {}
         self._move_offset = (0, 0)
         self._action_color: tuple[int, int, int] | None = None
-        self.items_grid: list[list[PixelItem]] = []
+        # ARGB colour shown for each LED, as an array and as nested lists
+        # (indexed [y][x]) for cheap per-cell reads while drawing; both are
+        # kept in step with the frame by refresh_from_frame.
+        self._led_argb: np.ndarray | None = None
+        self._led_colors: list[list[int]] = []
+        self._grid: LedGridItem | None = None
         self._build_grid()
 
     def _active_color(self, override: tuple[int, int, int] | None = None) -> tuple[int, int, int]:
@@ -133,29 +309,53 @@ class LedMatrixScene(QGraphicsScene):
 
     def _build_grid(self) -> None:
         self.clear()
-        self.items_grid = []
         width = 64 * (self.cell_size + self.margin) - self.margin
         height = 32 * (self.cell_size + self.margin) - self.margin
         self.setSceneRect(0, 0, width, height)
 
-        for y in range(32):
-            row: list[PixelItem] = []
-            for x in range(64):
-                px = x * (self.cell_size + self.margin)
-                py = y * (self.cell_size + self.margin)
-                rect = QRectF(px, py, self.cell_size, self.cell_size)
-                item = PixelItem(x, y, rect)
-                r, g, b = self.frame.display[y][x]
-                item.setBrush(QBrush(rgb565_to_qcolor(r, g, b)))
-                self.addItem(item)
-                row.append(item)
-            self.items_grid.append(row)
+        self._led_argb = frame_to_argb32(self.frame)
+        self._led_colors = self._led_argb.tolist()
+        self._grid = LedGridItem(self)
+        self._grid.setZValue(-1)
+        self.addItem(self._grid)
 
     def refresh_from_frame(self) -> None:
-        for y in range(32):
-            for x in range(64):
-                r, g, b = self.frame.display[y][x]
-                self.items_grid[y][x].setBrush(QBrush(rgb565_to_qcolor(r, g, b)))
+        argb = frame_to_argb32(self.frame)
+        ys, xs = np.nonzero(argb != self._led_argb)
+        if not len(ys):
+            return
+        self._led_argb = argb
+        colors = self._led_colors
+        changed = list(zip(xs.tolist(), ys.tolist()))
+        for x, y in changed:
+            colors[y][x] = int(argb[y, x])
+        self._grid.update_cells(changed)
+
+    def _cell_rect(self, x: int, y: int) -> QRectF:
+        pitch = self.cell_size + self.margin
+        return QRectF(x * pitch, y * pitch, self.cell_size, self.cell_size)
+
+    def _cells_in(self, rect: QRectF) -> list[tuple[int, int]]:
+        pitch = self.cell_size + self.margin
+        x1 = max(0, int(rect.left() // pitch))
+        y1 = max(0, int(rect.top() // pitch))
+        x2 = min(63, int(rect.right() // pitch))
+        y2 = min(31, int(rect.bottom() // pitch))
+        return [(x, y) for y in range(y1, y2 + 1) for x in range(x1, x2 + 1)]
+
+    def _cell_at(self, pos) -> tuple[int, int] | None:
+        # Cell whose LED (its circle and outline) contains pos, if any.
+        pitch = self.cell_size + self.margin
+        gx = int(pos.x() // pitch)
+        gy = int(pos.y() // pitch)
+        if not (0 <= gx < 64 and 0 <= gy < 32):
+            return None
+        radius = self.cell_size / 2
+        dx = pos.x() - gx * pitch - radius
+        dy = pos.y() - gy * pitch - radius
+        if dx * dx + dy * dy > (radius + 0.5) ** 2:
+            return None
+        return gx, gy
 
     def set_current_color(self, r5: int, g6: int, b5: int) -> None:
         self.current_color = (r5, g6, b5)
@@ -172,10 +372,10 @@ class LedMatrixScene(QGraphicsScene):
     def clear_selection(self) -> None:
         if not self._selection:
             return
-        for (x, y) in self._selection:
-            self.items_grid[y][x].setPen(self.items_grid[y][x].default_pen)
+        cells = list(self._selection)
         self._selection.clear()
         self._clear_move_preview()
+        self._grid.update_cells(cells)
 
     def mousePressEvent(self, event):
         view = self.views()[0] if self.views() else None
@@ -353,11 +553,12 @@ class LedMatrixScene(QGraphicsScene):
         super().mouseReleaseEvent(event)
 
     def _paint_at(self, pos, view, color_override: tuple[int, int, int] | None = None) -> None:
-        item = self.itemAt(pos, view.transform())
-        if isinstance(item, PixelItem):
+        cell = self._cell_at(pos)
+        if cell is not None:
+            x, y = cell
             r5, g6, b5 = self._active_color(color_override)
-            self.frame.display[item.y][item.x] = (r5, g6, b5)
-            item.setBrush(QBrush(rgb565_to_qcolor(r5, g6, b5)))
+            self.frame.setColor(x, y, r5, g6, b5)
+            self.refresh_from_frame()
 
     def _apply_rect(self, rect: QRectF) -> None:
         if rect.isNull():
@@ -373,8 +574,8 @@ class LedMatrixScene(QGraphicsScene):
         y2 = max(0, min(31, y2))
         for y in range(min(y1, y2), max(y1, y2) + 1):
             for x in range(min(x1, x2), max(x1, x2) + 1):
-                self.frame.display[y][x] = (r5, g6, b5)
-                self.items_grid[y][x].setBrush(QBrush(rgb565_to_qcolor(r5, g6, b5)))
+                self.frame.setColor(x, y, r5, g6, b5)
+        self.refresh_from_frame()
 
     def _apply_oval(self, rect: QRectF) -> None:
         if rect.isNull():
@@ -458,41 +659,21 @@ class LedMatrixScene(QGraphicsScene):
 
     def _apply_bucket(self, pos) -> None:
         gx, gy = self._scene_to_grid(pos.x(), pos.y())
-        target = self.frame.display[gy][gx]
-        replacement = self._active_color()
-        if target == replacement:
-            return
-        w, h = 64, 32
-        stack = [(gx, gy)]
-        visited = set()
-        while stack:
-            x, y = stack.pop()
-            if (x, y) in visited:
-                continue
-            visited.add((x, y))
-            if self.frame.display[y][x] != target:
-                continue
-            self.frame.display[y][x] = replacement
-            if x > 0:
-                stack.append((x - 1, y))
-            if x < w - 1:
-                stack.append((x + 1, y))
-            if y > 0:
-                stack.append((x, y - 1))
-            if y < h - 1:
-                stack.append((x, y + 1))
+        r5, g6, b5 = self._active_color()
+        self.frame.fill(gx, gy, r5, g6, b5)
         self.refresh_from_frame()
 
     def _apply_selection_color(self) -> None:
         r5, g6, b5 = self._active_color()
-        for (x, y) in self._selection:
-            self.frame.display[y][x] = (r5, g6, b5)
-            self.items_grid[y][x].setBrush(QBrush(rgb565_to_qcolor(r5, g6, b5)))
+        with self.frame.batch():
+            for (x, y) in self._selection:
+                self.frame.setColor(x, y, r5, g6, b5)
+        self.refresh_from_frame()
 
     def _select_at(self, pos, view) -> None:
-        item = self.itemAt(pos, view.transform())
-        if isinstance(item, PixelItem):
-            self._add_to_selection(item.x, item.y)
+        cell = self._cell_at(pos)
+        if cell is not None:
+            self._add_to_selection(*cell)
 
     def _apply_select_rect(self, rect: QRectF) -> None:
         if rect.isNull():
@@ -511,34 +692,16 @@ class LedMatrixScene(QGraphicsScene):
 
     def _select_fill(self, pos) -> None:
         gx, gy = self._scene_to_grid(pos.x(), pos.y())
-        target = self.frame.display[gy][gx]
-        stack = [(gx, gy)]
-        visited = set()
-        while stack:
-            x, y = stack.pop()
-            if (x, y) in visited:
-                continue
-            visited.add((x, y))
-            if self.frame.display[y][x] != target:
-                continue
+        for x, y in self.frame.floodRegion(gx, gy):
             self._add_to_selection(x, y)
-            if x > 0:
-                stack.append((x - 1, y))
-            if x < 63:
-                stack.append((x + 1, y))
-            if y > 0:
-                stack.append((x, y - 1))
-            if y < 31:
-                stack.append((x, y + 1))
 
     def _start_move(self, pos, view) -> None:
-        item = self.itemAt(pos, view.transform())
-        if not isinstance(item, PixelItem) or (item.x, item.y) not in self._selection:
+        if self._cell_at(pos) not in self._selection:
             return
         self._begin_action(view)
         self._move_active = True
         self._move_start = pos
-        self._move_colors = {coord: self.frame.display[coord[1]][coord[0]] for coord in self._selection}
+        self._move_colors = {coord: self.frame.getPixel(coord[0], coord[1]) for coord in self._selection}
         self._move_offset = (0, 0)
         self._update_move_preview(pos)
 
@@ -553,24 +716,23 @@ class LedMatrixScene(QGraphicsScene):
             return
         self._move_offset = (dx, dy)
         self._clear_move_preview()
-        preview = set()
+        preview = {}
         for (x, y), color in self._move_colors.items():
             nx = x + dx
             ny = y + dy
             if 0 <= nx < 64 and 0 <= ny < 32:
-                preview.add((nx, ny))
                 qc = rgb565_to_qcolor(*color)
                 qc.setAlpha(120)
-                self.items_grid[ny][nx].setBrush(QBrush(qc))
-        self._move_preview = preview
+                preview[(nx, ny)] = qc
+        self._move_preview_colors = preview
+        self._grid.update_cells(list(preview))
 
     def _clear_move_preview(self) -> None:
-        if not self._move_preview:
+        if not self._move_preview_colors:
             return
-        for (x, y) in self._move_preview:
-            r, g, b = self.frame.display[y][x]
-            self.items_grid[y][x].setBrush(QBrush(rgb565_to_qcolor(r, g, b)))
-        self._move_preview.clear()
+        cells = list(self._move_preview_colors)
+        self._move_preview_colors = {}
+        self._grid.update_cells(cells)
 
     def _commit_move(self) -> None:
         if not self._move_active:
@@ -598,7 +760,7 @@ class LedMatrixScene(QGraphicsScene):
         if (x, y) in self._selection:
             return
         self._selection.add((x, y))
-        self.items_grid[y][x].setPen(self.items_grid[y][x].selected_pen)
+        self._grid.update_cells([(x, y)])
 
     def _scene_to_grid(self, x: float, y: float) -> tuple[int, int]:
         gx = int(x // (self.cell_size + self.margin))
@@ -710,7 +872,7 @@ class LedMatrixWidget(QMainWindow):
         if not tab:
             return
         # Copy display data into the current tab's frame.
-        tab["frame"].display = [list(row) for row in frame.display]
+        tab["frame"].copy_from(frame)
         tab["scene"].refresh_from_frame()
         tab["undo"].clear()
         tab["redo"].clear()
@@ -720,7 +882,7 @@ class LedMatrixWidget(QMainWindow):
         tab = self._tab_for_index(index)
         if not tab:
             return
-        tab["frame"].display = [list(row) for row in frame.display]
+        tab["frame"].copy_from(frame)
         tab["scene"].refresh_from_frame()
         tab["undo"].clear()
         tab["redo"].clear()
@@ -32,8 +32,14 @@ def read_frame_file(file_path: str | Path) -> bytes:
 	return data
 
 
-def send_frame_bytes(frame_bytes: bytes, out_path: str | Path | None = None) -> None:
-	"""Write a single 4096-byte frame to disk via an atomic swap."""
+def send_frame_bytes(
+	frame_bytes: bytes | memoryview,
+	out_path: str | Path | None = None,
+) -> None:
+	"""Write a single 4096-byte frame to disk via an atomic swap.
+
+	Accepts any bytes-like object; the data is written as-is without copying.
+	"""
 
 	_validate_frame_size(frame_bytes)
 	path = default_frame_path() if out_path is None else Path(out_path)
@@ -50,7 +56,7 @@ def send_frame_file(
 	send_frame_bytes(frame_bytes, out_path=out_path)
 
 
-def _validate_frame_size(frame_bytes: bytes, path: Path | None = None) -> None:
+def _validate_frame_size(frame_bytes: bytes | memoryview, path: Path | None = None) -> None:
 	if len(frame_bytes) != FRAME_BYTE_SIZE:
 		suffix = f": {path}" if path is not None else ""
 		raise ValueError(
@@ -58,7 +64,7 @@ def _validate_frame_size(frame_bytes: bytes, path: Path | None = None) -> None:
 		)
 
 
-def _atomic_write_bytes(path: Path, data: bytes) -> None:
+def _atomic_write_bytes(path: Path, data: bytes | memoryview) -> None:
 	path = Path(path)
 	path.parent.mkdir(parents=True, exist_ok=True)
 	tmp_path = path.with_name(f"{path.name}.tmp.{os.getpid()}.{time.time_ns()}")